@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+"""In-process benchmarks - run with python -m benchmarks"""
@@ -0,0 +1,82 @@
+# benchmarks/__main__.py
+"""
+Run the suite without a server
+
+    python -m benchmarks --save benchmarks/baseline.json
+    python -m benchmarks --compare benchmarks/baseline.json
+"""
+
+import argparse
+import os
+import sys
+
+# Book ingestion would spawn a worker process inside the ASGI benchmarks
+os.environ.setdefault('EREADER_INGEST', '0')
+
+from .runner import (  # noqa: E402
+    BENCH_CONFIG,
+    compare,
+    load_baseline,
+    run_benchmarks,
+    save_baseline,
+)
+from .suite import BENCHMARKS  # noqa: E402
+
+VERDICT_MARKS = {'regression': '❌', 'improvement': '✅', 'same': '  '}
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('us', 1e3)):
+        if ns >= scale:
+            return f'{ns / scale:.2f}{unit}'
+    return f'{ns:.0f}ns'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Retro OS hot-path benchmarks')
+    parser.add_argument('-k', '--filter', help='only names containing this')
+    parser.add_argument('--samples', type=int, default=BENCH_CONFIG['SAMPLES'])
+    parser.add_argument('--save', metavar='PATH', help='write results as a baseline')
+    parser.add_argument('--compare', metavar='PATH', help='baseline to compare with')
+    args = parser.parse_args()
+
+    selected = {
+        name: setup
+        for name, setup in BENCHMARKS.items()
+        if not args.filter or args.filter in name
+    }
+    baseline = load_baseline(args.compare) if args.compare else {}
+
+    results = {}
+    for name, result in run_benchmarks(selected, args.samples):
+        results[name] = result
+        line = (
+            f'{name:<42}{format_ns(result["mean_ns"]):>10} '
+            f'± {format_ns(result["stdev_ns"]):<9}'
+        )
+        if name in baseline:
+            verdict = compare(baseline, {name: result})[name]
+            line += (
+                f'{VERDICT_MARKS[verdict["verdict"]]} '
+                f'{(verdict["ratio"] - 1) * 100:+6.1f}%  p={verdict["p"]:.3f}'
+            )
+        print(line, flush=True)
+
+    if args.save:
+        save_baseline(args.save, results)
+        print(f'\nSaved baseline to {args.save}')
+
+    if baseline:
+        regressions = [
+            name
+            for name, verdict in compare(baseline, results).items()
+            if verdict['verdict'] == 'regression'
+        ]
+        if regressions:
+            print(f'\n❌ {len(regressions)} significant regression(s)')
+            sys.exit(1)
+        print('\n✅ No significant regressions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/memory.py
+"""
+Retained memory per open window - what window state keeps alive once a
+window's HTML has been sent, against the old model that also kept its FT tree
+
+    python -m benchmarks.memory
+"""
+
+import os
+import sys
+
+# Book ingestion would spawn a worker process when the eReader loads
+os.environ.setdefault('EREADER_INGEST', '0')
+
+MEMORY_BUDGET = {
+    'MAX_WINDOW_BYTES': 1024,  # Retained per open window - fail above this
+}
+
+
+def retained_per_window() -> dict:
+    """Window name -> (bytes retained with the FT tree, bytes retained now)"""
+    from desktop.components import CreateContent
+    from desktop.memory import deep_sizeof
+    from desktop.state import ICON_POSITIONS, WindowManager
+    from desktop.vfs import virtual_fs
+
+    sizes = {}
+    for name in ICON_POSITIONS:
+        item_type = 'folder' if virtual_fs.is_folder(name) else 'program'
+        manager = WindowManager()
+        empty = deep_sizeof(manager.windows)
+        manager.create_window(name, 1, 1, item_type)
+        record = deep_sizeof(manager.windows) - empty
+        # The content tree window state used to hold on to for every window
+        content = deep_sizeof(CreateContent(name, item_type))
+        sizes[name] = (record + content, record)
+    return sizes
+
+
+def main():
+    sizes = retained_per_window()
+    print(f'{"window":<16}{"with FT tree":>14}{"descriptor":>12}')
+    for name, (before, after) in sizes.items():
+        print(f'{name:<16}{before:>12,} B{after:>10,} B')
+
+    budget = MEMORY_BUDGET['MAX_WINDOW_BYTES']
+    over = {name: after for name, (_, after) in sizes.items() if after > budget}
+    if over:
+        print(f'\n❌ Over {budget:,} B per window: {over}')
+        sys.exit(1)
+    print(f'\n✅ Every window retains at most {budget:,} B')
+
+
+if __name__ == '__main__':
+    main()
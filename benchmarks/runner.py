@@ -0,0 +1,115 @@
+# benchmarks/runner.py
+"""Timing loop, JSON baselines and baseline comparison"""
+
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import UTC, datetime
+from time import perf_counter_ns
+
+from .stats import welch_t_test
+
+BENCH_CONFIG = {
+    'SAMPLES': 20,  # Timed samples per benchmark
+    'MIN_SAMPLE_NS': 20_000_000,  # Loops per sample are doubled until this long
+    'MAX_LOOPS': 1 << 20,
+    'ALPHA': 0.01,  # Significance level for flagging a change
+    'THRESHOLD': 0.05,  # Smallest relative change worth reporting
+}
+
+
+def calibrate(run) -> int:
+    """Loops per sample so one sample is long enough to time reliably"""
+    loops = 1
+    while loops < BENCH_CONFIG['MAX_LOOPS']:
+        start = perf_counter_ns()
+        for _ in range(loops):
+            run()
+        if perf_counter_ns() - start >= BENCH_CONFIG['MIN_SAMPLE_NS']:
+            break
+        loops *= 2
+    return loops
+
+
+def measure(run, samples: int, loops: int) -> list[float]:
+    """Per-call nanoseconds, one value per sample"""
+    timings = []
+    for _ in range(samples):
+        start = perf_counter_ns()
+        for _ in range(loops):
+            run()
+        timings.append((perf_counter_ns() - start) / loops)
+    return timings
+
+
+def run_benchmarks(benchmarks: dict, samples: int = BENCH_CONFIG['SAMPLES']):
+    """Time each benchmark - yields (name, result) as they finish"""
+    for name, setup in benchmarks.items():
+        run = setup()
+        loops = calibrate(run)
+        gc.collect()
+        timings = measure(run, samples, loops)
+
+        yield (
+            name,
+            {
+                'loops': loops,
+                'samples_ns': timings,
+                'mean_ns': statistics.fmean(timings),
+                'median_ns': statistics.median(timings),
+                'stdev_ns': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            },
+        )
+
+
+def metadata() -> dict:
+    return {
+        'created': datetime.now(UTC).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': os.cpu_count(),
+        'timer_resolution_ns': time.get_clock_info('perf_counter').resolution * 1e9,
+    }
+
+
+def save_baseline(path: str, results: dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': metadata(), 'results': results}, f, indent=2)
+
+
+def load_baseline(path: str) -> dict:
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['results']
+
+
+def compare(
+    baseline: dict,
+    results: dict,
+    alpha: float = BENCH_CONFIG['ALPHA'],
+    threshold: float = BENCH_CONFIG['THRESHOLD'],
+) -> dict:
+    """Verdict per shared benchmark - only significant and large changes count"""
+    verdicts = {}
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = result['mean_ns'] / base['mean_ns']
+        _, _, p = welch_t_test(base['samples_ns'], result['samples_ns'])
+        if p < alpha and ratio > 1 + threshold:
+            verdict = 'regression'
+        elif p < alpha and ratio < 1 - threshold:
+            verdict = 'improvement'
+        else:
+            verdict = 'same'
+        verdicts[name] = {'ratio': ratio, 'p': p, 'verdict': verdict}
+    return verdicts
@@ -0,0 +1,164 @@
+# benchmarks/startup.py
+"""
+Cold-start budget - fresh interpreters, from spawn to the first response
+
+    python -m benchmarks.startup             # median of several cold starts
+    python -m benchmarks.startup --report    # plus the slowest imports
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+STARTUP_CONFIG = {
+    'RUNS': 5,  # Cold starts measured - the median is checked
+    'BUDGET_MS': 900,  # Spawn to first response - about 1.5x today's median
+    'RSS_BUDGET_MB': 64,  # Peak RSS after the first response
+    'TOP': 15,  # Imports listed by --report
+}
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the fresh interpreter - lifespan startup, then GET / over raw ASGI
+# so no HTTP client import is timed along with the app
+CHILD = r"""
+import asyncio, json, os, resource, sys, time
+
+started = time.perf_counter()
+from main import app
+imported = time.perf_counter()
+
+
+async def first_response():
+    lifespan_in = asyncio.Queue()
+    ready = asyncio.Event()
+
+    async def lifespan_send(message):
+        if message['type'].startswith('lifespan.startup'):
+            ready.set()
+
+    await lifespan_in.put({'type': 'lifespan.startup'})
+    lifespan = asyncio.create_task(
+        app({'type': 'lifespan', 'asgi': {'version': '3.0'}}, lifespan_in.get,
+            lifespan_send)
+    )
+    await ready.wait()
+
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': '/', 'raw_path': b'/',
+        'query_string': b'', 'root_path': '', 'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0), 'server': ('127.0.0.1', 8000),
+    }
+    await app(scope, receive, send)
+    status = messages[0]['status']
+    responded = time.perf_counter()
+    responded_at = time.time()
+
+    await lifespan_in.put({'type': 'lifespan.shutdown'})
+    await lifespan
+    return status, responded, responded_at
+
+
+status, responded, responded_at = asyncio.run(first_response())
+print(json.dumps({
+    'status': status,
+    'total_ms': (responded_at - float(os.environ['STARTUP_SPAWNED_AT'])) * 1000,
+    'import_ms': (imported - started) * 1000,
+    'first_response_ms': (responded - imported) * 1000,
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}), file=sys.__stdout__)
+"""
+
+IMPORT_TIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def cold_start(importtime: bool = False) -> tuple[dict, str]:
+    """One fresh interpreter - its measurements and its -X importtime output"""
+    env = {
+        **os.environ,
+        'EREADER_INGEST': '0',  # The inbox watcher would spawn a process pool
+        'LOG_LEVEL': 'WARNING',
+        'STARTUP_SPAWNED_AT': repr(time.time()),
+    }
+    command = [sys.executable, *(['-X', 'importtime'] if importtime else [])]
+    result = subprocess.run(
+        [*command, '-c', CHILD],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def import_report(stderr: str, top: int = STARTUP_CONFIG['TOP']) -> list[tuple]:
+    """Slowest imports as (cumulative us, self us, depth, module)"""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match:
+            own, cumulative, indent, module = match.groups()
+            rows.append((int(cumulative), int(own), len(indent) // 2, module))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Retro OS cold-start budget')
+    parser.add_argument('--runs', type=int, default=STARTUP_CONFIG['RUNS'])
+    parser.add_argument('--budget', type=float, default=STARTUP_CONFIG['BUDGET_MS'])
+    parser.add_argument(
+        '--rss-budget', type=float, default=STARTUP_CONFIG['RSS_BUDGET_MB']
+    )
+    parser.add_argument('--report', action='store_true', help='show slow imports')
+    args = parser.parse_args()
+
+    runs = [cold_start()[0] for _ in range(args.runs)]
+    median = {
+        key: statistics.median(run[key] for run in runs)
+        for key in ('total_ms', 'import_ms', 'first_response_ms', 'rss_mb')
+    }
+
+    print(f'Cold start over {args.runs} runs (median)')
+    print(f'  spawn to first response {median["total_ms"]:8.1f} ms')
+    print(f'  import main             {median["import_ms"]:8.1f} ms')
+    print(f'  startup + GET /         {median["first_response_ms"]:8.1f} ms')
+    print(f'  peak RSS                {median["rss_mb"]:8.1f} MB')
+
+    if args.report:
+        _, stderr = cold_start(importtime=True)
+        print(f'\n{"cumulative":>12}{"self":>10}  module')
+        for cumulative, own, depth, module in import_report(stderr):
+            name = '  ' * depth + module
+            print(f'{cumulative / 1000:10.1f}ms{own / 1000:8.1f}ms  {name}')
+
+    failures = []
+    if any(run['status'] != 200 for run in runs):
+        failures.append('GET / did not return 200')
+    if median['total_ms'] > args.budget:
+        failures.append(f'cold start {median["total_ms"]:.0f}ms > {args.budget:.0f}ms')
+    if median['rss_mb'] > args.rss_budget:
+        failures.append(f'RSS {median["rss_mb"]:.0f}MB > {args.rss_budget:.0f}MB')
+
+    if failures:
+        print(f'\n❌ Over budget: {"; ".join(failures)}')
+        sys.exit(1)
+    print(f'\n✅ Within budget ({args.budget:.0f}ms, {args.rss_budget:.0f}MB)')
+
+
+if __name__ == '__main__':
+    main()
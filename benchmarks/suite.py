@@ -0,0 +1,142 @@
+# benchmarks/suite.py
+"""
+Hot-path benchmarks
+Each entry does its setup once and returns the zero-argument callable to time
+"""
+
+import atexit
+import random
+import shutil
+import tempfile
+
+from fasthtml.common import to_xml
+
+BENCHMARKS = {}  # name -> setup function
+
+
+def benchmark(name: str):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def seeded_game(width: int, height: int):
+    from programs.game_of_life.game import GameOfLife
+
+    game = GameOfLife(width, height)
+    rng = random.Random(42)
+    game.grid = [[rng.random() < 0.3 for _ in range(width)] for _ in range(height)]
+    return game
+
+
+def _game_step(width: int, height: int):
+    game = seeded_game(width, height)
+    initial = [row[:] for row in game.grid]
+
+    def run():
+        # Restart from the same board so every sample does the same work
+        game.grid = [row[:] for row in initial]
+        game.step()
+
+    return run
+
+
+for _width, _height in ((20, 15), (50, 50), (100, 100)):
+    benchmark(f'game.step[{_width}x{_height}]')(
+        lambda w=_width, h=_height: _game_step(w, h)
+    )
+
+
+@benchmark('render.GameGrid[20x15]')
+def _render_game_grid():
+    from programs.game_of_life.components import GameGrid
+
+    game = seeded_game(20, 15)
+    return lambda: to_xml(GameGrid(game))
+
+
+@benchmark('render.Desktop')
+def _render_desktop():
+    from desktop.components import Desktop
+
+    return lambda: to_xml(Desktop())
+
+
+@benchmark('render.LibraryView')
+def _render_library():
+    from programs.ereader.library import LibraryView
+
+    return lambda: to_xml(LibraryView())
+
+
+def _open_folder(entries: int):
+    """First page of a mounted folder, listed cold - cost must not track size"""
+    from desktop.components import FolderView
+    from desktop.vfs import virtual_fs
+
+    root = tempfile.mkdtemp(prefix='retro-os-bench-')
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    for i in range(entries):
+        open(f'{root}/file-{i:06d}.txt', 'w').close()
+    name = f'bench-{entries}'
+    virtual_fs.mount(name, root, icon=False)
+
+    def run():
+        virtual_fs.stat_cache.clear()
+        return to_xml(FolderView(name))
+
+    return run
+
+
+for _entries in (10, 100_000):
+    benchmark(f'render.FolderView[{_entries}]')(
+        lambda entries=_entries: _open_folder(entries)
+    )
+
+
+@benchmark('book.load_book_text[uncached]')
+def _load_book_text_uncached():
+    from programs.ereader.book import load_book_text
+
+    return lambda: load_book_text.__wrapped__('frankenstein')
+
+
+@benchmark('book.load_book_text[cached]')
+def _load_book_text_cached():
+    from programs.ereader.book import load_book_text
+
+    load_book_text('frankenstein')
+    return lambda: load_book_text('frankenstein')
+
+
+def _asgi_request(method: str, path: str, data: dict = None):
+    """Full request through the ASGI stack - in memory, no sockets"""
+    from starlette.testclient import TestClient
+
+    from main import app
+
+    client = TestClient(app)
+    client.get('/')  # Session cookie, lazy programs loaded
+    client.request(method, path, data=data)
+    return lambda: client.request(method, path, data=data)
+
+
+ASGI_REQUESTS = {
+    'asgi.GET /': ('GET', '/'),
+    'asgi.POST /open[eReader]': (
+        'POST',
+        '/open',
+        {'name': 'eReader', 'type': 'program', 'icon_x': 2, 'icon_y': 3},
+    ),
+    'asgi.POST /gameoflife/step': ('POST', '/gameoflife/step'),
+    'asgi.GET /api/book/frankenstein/highlights': (
+        'GET',
+        '/api/book/frankenstein/highlights',
+    ),
+    'asgi.GET /api/book/frankenstein/index': ('GET', '/api/book/frankenstein/index'),
+}
+
+for _name, _request in ASGI_REQUESTS.items():
+    benchmark(_name)(lambda request=_request: _asgi_request(*request))
@@ -0,0 +1,77 @@
+# benchmarks/sync.py
+"""
+Window sync round trip - a drag the client batches into /window/sync has to
+move the window state the server keeps, and a bad batch must change nothing
+
+    python -m benchmarks.sync
+"""
+
+import os
+import re
+import sys
+
+# Book ingestion would spawn a worker process when the eReader loads
+os.environ.setdefault('EREADER_INGEST', '0')
+
+SYNC_CHECK = {
+    'WINDOW': ('Game of Life', 'program', 1, 2),  # name, type, icon_x, icon_y
+    'DRAG_TO': [321, 123],  # Position the client reports after the drag
+}
+
+
+def run_checks() -> list:
+    """Failed checks as messages - empty when the round trip works"""
+    from starlette.testclient import TestClient
+
+    from desktop.state import window_managers
+    from main import app
+
+    client = TestClient(app)
+    name, item_type, icon_x, icon_y = SYNC_CHECK['WINDOW']
+    opened = client.post(
+        '/open',
+        data={'name': name, 'type': item_type, 'icon_x': icon_x, 'icon_y': icon_y},
+        headers={'HX-Request': 'true'},
+    )
+    # The id desktop-manager.js reads off the window element and syncs with
+    match = re.search(r'<div id="([^"]+)" class="window-frame"', opened.text)
+    if match is None:
+        return [f'/open returned no window element ({opened.status_code})']
+    dom_id = match.group(1)
+
+    (manager,) = window_managers.objects()
+    record = manager.get_window(dom_id)
+    if record is None:
+        return [f'DOM id {dom_id!r} is not a window the server knows']
+
+    failures = []
+    x, y = SYNC_CHECK['DRAG_TO']
+    response = client.post(
+        '/window/sync', json={'changes': [{'id': dom_id, 'position': [x, y]}]}
+    )
+    if response.status_code != 200 or response.json() != {'applied': 1}:
+        failures.append(f'drag sync answered {response.status_code} {response.text}')
+    if (record.x, record.y) != (x, y):
+        failures.append(f'drag left the record at {(record.x, record.y)}')
+
+    # A valid patch followed by a bad one - rejected as a whole
+    bad_batch = [{'id': dom_id, 'position': [0, 0]}, {'id': dom_id, 'closed': 'yes'}]
+    response = client.post('/window/sync', json={'changes': bad_batch})
+    if response.status_code != 400:
+        failures.append(f'bad batch answered {response.status_code}, not 400')
+    if (record.x, record.y) != (x, y) or manager.get_window(dom_id) is None:
+        failures.append('bad batch was partly applied')
+    return failures
+
+
+def main():
+    failures = run_checks()
+    for failure in failures:
+        print(f'❌ {failure}')
+    if failures:
+        sys.exit(1)
+    print('✅ Drag syncs reach the stored window, bad batches change nothing')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""
+Asset Pipeline
+Static files fingerprinted by content hash at startup, compressed once on first
+request and served from memory with immutable caching
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from fasthtml.common import Div
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # The brotli extra - gzip alone when it is not installed
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ASSET_CONFIG = {
+    'ROOTS': ('static', 'programs/game_of_life/static'),  # Relative to BASE_DIR
+    'URL_PREFIX': '/assets/',
+    'HASH_LENGTH': 10,
+    'MIN_COMPRESS_BYTES': 256,  # Smaller files are not worth an encoded variant
+    'COMPRESSIBLE': ('.css', '.js', '.svg', '.json', '.txt', '.html', '.ico'),
+    'IMMUTABLE': 'public, max-age=31536000, immutable',
+    'REVALIDATE': 'no-cache',  # Unfingerprinted URLs - cheap 304s via the ETag
+    'ENCODINGS': ('br', 'gzip', 'identity'),  # Smallest first - wins q-value ties
+}
+
+# url(/static/...) references inside stylesheets are rewritten to fingerprints
+CSS_URL = re.compile(r"""url\(\s*(['"]?)(/static/[^'")\s]+)\1\s*\)""")
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Lowercased coding -> q-value from an Accept-Encoding header"""
+    accepted = {}
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        if not coding:
+            continue
+        q = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[coding.lower()] = q
+    return accepted
+
+
+def negotiate_encoding(header: str, available) -> str:
+    """
+    Best coding in available the client accepts - q=0 rules a coding out,
+    '*' covers unlisted ones, and identity is the fallback when none fit
+    """
+    accepted = parse_accept_encoding(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = 'identity', 0.0
+    for coding in ASSET_CONFIG['ENCODINGS']:
+        q = accepted.get(coding, wildcard)
+        if coding in available and q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class Asset:
+    """One file - identity bytes plus variants compressed on first request"""
+
+    __slots__ = ('path', 'url', 'media_type', 'etag', '_body', '_encodings')
+
+    def __init__(self, path: str, body: bytes):
+        digest = hashlib.sha256(body).hexdigest()
+        stem, ext = os.path.splitext(path)
+        self.path = path
+        self.url = (
+            f'{ASSET_CONFIG["URL_PREFIX"]}{stem}'
+            f'.{digest[: ASSET_CONFIG["HASH_LENGTH"]]}{ext}'
+        )
+        self.media_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.etag = f'"{digest[:16]}"'
+        self._body = body
+        self._encodings = None
+
+    @property
+    def encodings(self) -> dict:
+        """
+        Encoding -> bytes - compressed once, off the startup path
+        warm_assets touches every asset before /readyz reports ready, so
+        requests only compress when warmup is disabled or still running
+        """
+        if self._encodings is None:
+            body = self._body
+            encodings = {'identity': body}
+            if (
+                os.path.splitext(self.path)[1] in ASSET_CONFIG['COMPRESSIBLE']
+                and len(body) >= ASSET_CONFIG['MIN_COMPRESS_BYTES']
+            ):
+                compressed = gzip.compress(body, compresslevel=9, mtime=0)
+                if len(compressed) < len(body):
+                    encodings['gzip'] = compressed
+                if brotli is not None:
+                    compressed = brotli.compress(body, quality=11)
+                    if len(compressed) < len(body):
+                        encodings['br'] = compressed
+            self._encodings = encodings
+        return self._encodings
+
+
+class AssetPipeline:
+    """Builds every asset on first use - later lookups are dict hits"""
+
+    def __init__(self, roots=ASSET_CONFIG['ROOTS'], base_dir: str = BASE_DIR):
+        self.roots = roots
+        self.base_dir = base_dir
+        self.generators = []  # Callables returning {path: bytes} built in code
+        self._by_path = None  # 'static/js/x.js' -> Asset
+        self._by_url = {}  # '/assets/static/js/x.<hash>.js' -> Asset
+        self._lock = threading.Lock()
+
+    def build(self):
+        """Fingerprint everything under the roots - compression is lazy"""
+        files = {}
+        for root in self.roots:
+            for dirpath, _, filenames in os.walk(os.path.join(self.base_dir, root)):
+                for filename in filenames:
+                    full_path = os.path.join(dirpath, filename)
+                    path = os.path.relpath(full_path, self.base_dir).replace(
+                        os.sep, '/'
+                    )
+                    with open(full_path, 'rb') as f:
+                        files[path] = f.read()
+        for generate in self.generators:
+            files.update(generate())
+
+        by_path = {}
+        # Stylesheets last - their url() references need the other fingerprints
+        for path in sorted(files, key=lambda p: p.endswith('.css')):
+            body = files[path]
+            if path.endswith('.css'):
+                body = CSS_URL.sub(
+                    lambda m: f'url({self._fingerprint(by_path, m.group(2))})',
+                    body.decode('utf-8'),
+                ).encode('utf-8')
+            by_path[path] = Asset(path, body)
+
+        with self._lock:
+            self._by_path = by_path
+            self._by_url = {asset.url: asset for asset in by_path.values()}
+
+    def add_generator(self, generate):
+        """Serve files produced by generate() - the next lookup rebuilds"""
+        with self._lock:
+            self.generators.append(generate)
+            self._by_path = None
+
+    @staticmethod
+    def _fingerprint(by_path: dict, url: str) -> str:
+        asset = by_path.get(url.lstrip('/'))
+        return asset.url if asset is not None else url
+
+    def _assets(self) -> dict:
+        if self._by_path is None:
+            self.build()
+        return self._by_path
+
+    def assets(self) -> list:
+        """Every asset, built on first use"""
+        return list(self._assets().values())
+
+    def get(self, path: str):
+        """Asset by repo-relative path ('static/js/x.js' or '/static/js/x.js')"""
+        return self._assets().get(path.lstrip('/'))
+
+    def url(self, path: str) -> str:
+        """Fingerprinted URL - unknown paths are returned unchanged"""
+        asset = self.get(path)
+        return asset.url if asset is not None else path
+
+    def by_url(self, url: str):
+        self._assets()
+        return self._by_url.get(url)
+
+    def response(self, request, asset: Asset, immutable: bool = True) -> Response:
+        """Best encoding the client accepts, or 304 when its copy is current"""
+        headers = {
+            'ETag': asset.etag,
+            'Cache-Control': ASSET_CONFIG['IMMUTABLE' if immutable else 'REVALIDATE'],
+            'Vary': 'Accept-Encoding',
+        }
+        if asset.etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers=headers)
+
+        encodings = asset.encodings
+        encoding = negotiate_encoding(
+            request.headers.get('accept-encoding', ''), encodings
+        )
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(
+            encodings[encoding], media_type=asset.media_type, headers=headers
+        )
+
+
+# Global instance
+asset_pipeline = AssetPipeline()
+
+
+def asset_url(path: str) -> str:
+    """Fingerprinted URL for a static file - use it anywhere HTML links an asset"""
+    return asset_pipeline.url(path)
+
+
+def ProgramAssets(scripts=(), styles=()):
+    """
+    Asset manifest marker for a program window - the desktop loader fetches
+    each URL once per page, scripts in order, then removes the marker
+    """
+    if not scripts and not styles:
+        return None
+    return Div(
+        cls='program-assets',
+        hidden=True,
+        data_scripts=' '.join(asset_url(path) for path in scripts),
+        data_styles=' '.join(asset_url(path) for path in styles),
+    )
@@ -0,0 +1,511 @@
+"""
+State Backends
+Pluggable key/value storage so app state can be shared between workers
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from uuid import uuid4
+
+from desktop.memory import register_cache
+
+logger = logging.getLogger(__name__)
+
+STATE_BACKEND = os.environ.get('STATE_BACKEND', 'memory')
+STATE_BACKEND_URL = os.environ.get('STATE_BACKEND_URL', '')
+
+BACKEND_CONFIG = {
+    'CACHE_TTL': 0.5,  # Seconds a read-through value is trusted before re-reading
+    'FLUSH_INTERVAL': 0.05,  # Seconds between batched write flushes
+    'MAX_BATCH': 200,  # Pending writes that force an immediate flush
+    'MAX_CACHED': 10000,  # Cached keys before expired ones are swept
+    'SWEEP_AFTER': 1000,  # In-memory keys before writes start sweeping expired ones
+    'SQLITE_PATH': 'retro-os-state.db',
+    'REDIS_URL': 'redis://localhost:6379/0',
+}
+
+_DELETED = object()
+
+
+class StateBackend(ABC):
+    """Key/value store for JSON-serializable state - values may carry a TTL"""
+
+    shared = True  # False when other worker processes cannot see the data
+
+    def get(self, key: str):
+        return self.get_many([key]).get(key)
+
+    @abstractmethod
+    def get_many(self, keys) -> dict:
+        """key -> value for the keys present and unexpired"""
+
+    def set(self, key: str, value, ttl: float = None):
+        self.set_many({key: value}, ttl)
+
+    @abstractmethod
+    def set_many(self, items: dict, ttl: float = None):
+        """Write every key - ttl in seconds, None to keep forever"""
+
+    def delete(self, key: str):
+        self.delete_many([key])
+
+    @abstractmethod
+    def delete_many(self, keys):
+        """Remove the keys - missing ones are ignored"""
+
+    @abstractmethod
+    def update(self, key: str, fn, ttl: float = None):
+        """
+        Atomic read-modify-write - stores and returns fn(current value or None)
+        Concurrent updates to the key, from any worker, are applied in turn.
+        fn may be called again if another writer got in first.
+        """
+
+    def flush(self):  # noqa: B027 - optional hook, not abstract
+        """Push buffered writes - a no-op for unbuffered backends"""
+
+    def close(self):
+        self.flush()
+
+
+class MemoryBackend(StateBackend):
+    """In-process dict - the single-worker default"""
+
+    shared = False
+
+    def __init__(self, sweep_after: int = BACKEND_CONFIG['SWEEP_AFTER']):
+        self._data = {}  # key -> (value, expires or None)
+        self._lock = threading.Lock()
+        self.sweep_after = sweep_after
+        self._sweep_at = sweep_after
+
+    def get_many(self, keys) -> dict:
+        now = time.time()
+        found = {}
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                if entry[1] is not None and entry[1] <= now:
+                    del self._data[key]
+                    continue
+                found[key] = entry[0]
+        return found
+
+    def set_many(self, items: dict, ttl: float = None):
+        now = time.time()
+        expires = now + ttl if ttl else None
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = (value, expires)
+            self._sweep(now)
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def update(self, key: str, fn, ttl: float = None):
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            live = entry is not None and (entry[1] is None or entry[1] > now)
+            value = fn(entry[0] if live else None)
+            self._data[key] = (value, now + ttl if ttl else None)
+            self._sweep(now)
+        return value
+
+    def _sweep(self, now: float):
+        # Called with the lock held. Keys that are never read again would stay
+        # forever, so writes drop expired ones once the dict has doubled since
+        # the last sweep - amortised O(1) per write.
+        if len(self._data) >= self._sweep_at:
+            self._data = {
+                key: entry
+                for key, entry in self._data.items()
+                if entry[1] is None or entry[1] > now
+            }
+            self._sweep_at = max(self.sweep_after, 2 * len(self._data))
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend(StateBackend):
+    """Shared SQLite file in WAL mode - one connection per thread"""
+
+    PRUNE_EVERY = 100  # Write batches between expired-row cleanups
+    UPSERT = (
+        'INSERT INTO state (key, value, expires) VALUES (?, ?, ?) '
+        'ON CONFLICT(key) DO UPDATE SET '
+        'value = excluded.value, expires = excluded.expires'
+    )
+
+    def __init__(self, path: str = BACKEND_CONFIG['SQLITE_PATH']):
+        self.path = path
+        self._local = threading.local()
+        self._connections = []
+        self._writes = 0
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS state '
+            '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)'
+        )
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            import sqlite3  # Only the sqlite backend pays for the import
+
+            conn = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+
+    def get_many(self, keys) -> dict:
+        keys = list(keys)
+        if not keys:
+            return {}
+        placeholders = ','.join('?' * len(keys))
+        rows = self._connect().execute(
+            f'SELECT key, value FROM state WHERE key IN ({placeholders}) '
+            'AND (expires IS NULL OR expires > ?)',
+            (*keys, time.time()),
+        )
+        return {key: json.loads(value) for key, value in rows}
+
+    def set_many(self, items: dict, ttl: float = None):
+        if not items:
+            return
+        expires = time.time() + ttl if ttl else None
+        conn = self._connect()
+        conn.execute('BEGIN')
+        try:
+            conn.executemany(
+                self.UPSERT,
+                [(key, json.dumps(value), expires) for key, value in items.items()],
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                conn.execute('DELETE FROM state WHERE expires <= ?', (time.time(),))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def delete_many(self, keys):
+        keys = list(keys)
+        if keys:
+            placeholders = ','.join('?' * len(keys))
+            self._connect().execute(
+                f'DELETE FROM state WHERE key IN ({placeholders})', keys
+            )
+
+    def update(self, key: str, fn, ttl: float = None):
+        conn = self._connect()
+        # IMMEDIATE takes the write lock up front - other workers wait their turn
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = time.time()
+            row = conn.execute(
+                'SELECT value FROM state WHERE key = ? '
+                'AND (expires IS NULL OR expires > ?)',
+                (key, now),
+            ).fetchone()
+            value = fn(json.loads(row[0]) if row is not None else None)
+            conn.execute(
+                self.UPSERT, (key, json.dumps(value), now + ttl if ttl else None)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return value
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+        self._local = threading.local()
+
+
+class RedisBackend(StateBackend):
+    """
+    Any Redis-protocol server (Redis, Valkey, KeyDB) - needs the redis extra
+    There is deliberately no in-process fallback: a per-worker stand-in would
+    quietly split state between workers, so a missing package fails at start.
+    `make redis` runs a local Valkey server for development.
+    """
+
+    def __init__(
+        self, url: str = BACKEND_CONFIG['REDIS_URL'], prefix: str = 'retro-os:'
+    ):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                'RedisBackend needs the redis extra - '
+                "pip install 'fasthtml-retro-os[redis]'"
+            ) from e
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get_many(self, keys) -> dict:
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self._client.mget([self.prefix + key for key in keys])
+        return {
+            key: json.loads(value)
+            for key, value in zip(keys, values, strict=True)
+            if value is not None
+        }
+
+    def set_many(self, items: dict, ttl: float = None):
+        pipe = self._client.pipeline(transaction=False)
+        for key, value in items.items():
+            pipe.set(
+                self.prefix + key,
+                json.dumps(value),
+                px=int(ttl * 1000) if ttl else None,
+            )
+        pipe.execute()
+
+    def delete_many(self, keys):
+        keys = [self.prefix + key for key in keys]
+        if keys:
+            self._client.delete(*keys)
+
+    def update(self, key: str, fn, ttl: float = None):
+        name = self.prefix + key
+
+        def apply(pipe):
+            # WATCH/MULTI - retried from here if another client writes the key
+            raw = pipe.get(name)
+            value = fn(json.loads(raw) if raw is not None else None)
+            pipe.multi()
+            pipe.set(name, json.dumps(value), px=int(ttl * 1000) if ttl else None)
+            return value
+
+        return self._client.transaction(apply, name, value_from_callable=True)
+
+    def close(self):
+        self._client.close()
+
+
+class CachedBackend(StateBackend):
+    """Read-through cache and write-behind batching in front of a shared backend"""
+
+    def __init__(
+        self,
+        backend: StateBackend,
+        cache_ttl: float = BACKEND_CONFIG['CACHE_TTL'],
+        flush_interval: float = BACKEND_CONFIG['FLUSH_INTERVAL'],
+        max_batch: int = BACKEND_CONFIG['MAX_BATCH'],
+        max_cached: int = BACKEND_CONFIG['MAX_CACHED'],
+    ):
+        self.backend = backend
+        self.shared = backend.shared
+        self.cache_ttl = cache_ttl
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_cached = max_cached
+        self._cache = {}  # key -> (value, fresh_until)
+        self._pending = {}  # key -> (value or _DELETED, ttl), last write wins
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get_many(self, keys) -> dict:
+        now = time.monotonic()
+        found, misses = {}, []
+        with self._lock:
+            for key in keys:
+                # Read-your-writes: buffered values win over the backend
+                if key in self._pending:
+                    value = self._pending[key][0]
+                    if value is not _DELETED:
+                        found[key] = value
+                    continue
+                cached = self._cache.get(key)
+                if cached is not None and cached[1] > now:
+                    if cached[0] is not _DELETED:
+                        found[key] = cached[0]
+                else:
+                    misses.append(key)
+
+        if misses:
+            loaded = self.backend.get_many(misses)
+            fresh_until = time.monotonic() + self.cache_ttl
+            with self._lock:
+                self._sweep(now)
+                for key in misses:
+                    value = loaded.get(key, _DELETED)
+                    self._cache[key] = (value, fresh_until)
+                    if value is not _DELETED:
+                        found[key] = value
+        return found
+
+    def set_many(self, items: dict, ttl: float = None):
+        self._buffer({key: (value, ttl) for key, value in items.items()})
+
+    def delete_many(self, keys):
+        self._buffer(dict.fromkeys(keys, (_DELETED, None)))
+
+    def update(self, key: str, fn, ttl: float = None):
+        # Buffered writes land first, so fn never sees an older value than get()
+        self.flush()
+        value = self.backend.update(key, fn, ttl)
+        with self._lock:
+            self._cache[key] = (value, time.monotonic() + self.cache_ttl)
+        return value
+
+    def _buffer(self, writes: dict):
+        fresh_until = time.monotonic() + self.cache_ttl
+        with self._lock:
+            self._sweep(fresh_until - self.cache_ttl)
+            for key, (value, _) in writes.items():
+                self._cache[key] = (value, fresh_until)
+            self._pending.update(writes)
+            overflow = len(self._pending) >= self.max_batch
+
+        if overflow:
+            self.flush()
+        elif self._thread is None:
+            self._start_flusher()
+
+    def _sweep(self, now: float):
+        # Called with the lock held - keeps the cache bounded by live keys
+        if len(self._cache) >= self.max_cached:
+            self._cache = {
+                key: entry for key, entry in self._cache.items() if entry[1] > now
+            }
+
+    def _start_flusher(self):
+        with self._flush_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='state-flush', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Error flushing state backend')
+
+    def flush(self):
+        """Write all buffered changes in one batch per TTL group"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+
+            deletes = [key for key, (value, _) in pending.items() if value is _DELETED]
+            batches = {}
+            for key, (value, ttl) in pending.items():
+                if value is not _DELETED:
+                    batches.setdefault(ttl, {})[key] = value
+
+            for ttl, items in batches.items():
+                self.backend.set_many(items, ttl)
+            if deletes:
+                self.backend.delete_many(deletes)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        self.flush()
+        self.backend.close()
+
+
+class SyncedState:
+    """
+    Mirrors one object into a backend key
+    Objects provide dump_state()/load_state() - reloads only on foreign writes
+    """
+
+    def __init__(self, backend: StateBackend, key: str, obj, ttl: float = None):
+        self.backend = backend
+        self.key = key
+        self.obj = obj
+        self.ttl = ttl
+        self.rev = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Refresh the object if another worker saved a newer revision"""
+        if self.backend.shared:
+            snapshot = self.backend.get(self.key)
+            with self._lock:
+                if snapshot is not None and snapshot['rev'] != self.rev:
+                    self.obj.load_state(snapshot['state'])
+                    self.rev = snapshot['rev']
+        return self.obj
+
+    def save(self):
+        if self.backend.shared:
+            self.rev = uuid4().hex
+            self.backend.set(
+                self.key, {'rev': self.rev, 'state': self.obj.dump_state()}, self.ttl
+            )
+
+    def transact(self, mutate):
+        """
+        Run mutate(obj) on the latest saved state and save it in one atomic
+        backend update - concurrent writers, in any worker, go one at a time
+        Returns what mutate returns, so responses render from the same state.
+        """
+        with self._lock:
+            if not self.backend.shared:
+                return mutate(self.obj)
+
+            result = None
+
+            def apply(snapshot):
+                nonlocal result
+                if snapshot is not None and snapshot['rev'] != self.rev:
+                    self.obj.load_state(snapshot['state'])
+                result = mutate(self.obj)
+                self.rev = uuid4().hex
+                return {'rev': self.rev, 'state': self.obj.dump_state()}
+
+            self.backend.update(self.key, apply, self.ttl)
+            return result
+
+
+def create_backend(name: str = STATE_BACKEND, url: str = STATE_BACKEND_URL):
+    """Backend from configuration - memory, sqlite or redis"""
+    if name == 'memory':
+        return MemoryBackend()
+    if name == 'sqlite':
+        return CachedBackend(SQLiteBackend(url or BACKEND_CONFIG['SQLITE_PATH']))
+    if name == 'redis':
+        return CachedBackend(RedisBackend(url or BACKEND_CONFIG['REDIS_URL']))
+    raise ValueError(f'Unknown state backend: {name}')
+
+
+# Global instance - buffered writes are flushed on exit
+state_backend = create_backend()
+atexit.register(state_backend.close)
+if isinstance(state_backend, CachedBackend):
+    register_cache(
+        'state_backend', lambda: len(state_backend._cache), lambda: state_backend._cache
+    )
+elif isinstance(state_backend, MemoryBackend):
+    register_cache('state_backend', state_backend.__len__, lambda: state_backend._data)
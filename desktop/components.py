@@ -1,15 +1,20 @@
 # desktop/components.py
 """Desktop UI components for the retro OS interface."""
 
-from functools import lru_cache
+import logging
+from urllib.parse import quote, urlencode
 
-from fasthtml.common import *
+from fasthtml.common import FT, H3, Button, Div, Input, Label, P, Select, Span
 
+from desktop.assets import ProgramAssets
+from desktop.fragments import cached_fragment
 from desktop.state import (
-    FOLDER_CONTENTS,
     ICON_POSITIONS,
     settings_manager,
+    window_id_for,
 )
+from desktop.vfs import virtual_fs
+from programs import program_registry
 
 from .ui_helpers import (
     FONT_OPTIONS,
@@ -21,6 +26,8 @@ from .ui_helpers import (
     window_control_icon,  # This was missing!
 )
 
+logger = logging.getLogger(__name__)
+
 
 def Icon(name, cls='', size=None, alt=None):
     """Clean icon generation using helper."""
@@ -47,9 +54,9 @@ def TitleBar(title, window_id):
     )
 
 
-@lru_cache(maxsize=15)
+@cached_fragment('titlebar')
 def cached_window_titlebar(title: str, window_id: str):
-    """Cache window titlebar generation - uses new helper functions."""
+    """Cache window titlebar HTML - uses new helper functions."""
     return Div(
         Span(title, cls='window-title'),
         Div(
@@ -65,7 +72,7 @@ def cached_window_titlebar(title: str, window_id: str):
 def Window(title: str, content: FT, window_id: str = None, transparent: bool = False):
     """Reusable window component with caching"""
     if window_id is None:
-        window_id = f'window-{title.replace(" ", "-").lower()}'
+        window_id = window_id_for(title)
 
     # Get cached titlebar
     titlebar = cached_window_titlebar(title, window_id)
@@ -85,57 +92,140 @@ def Window(title: str, content: FT, window_id: str = None, transparent: bool = F
     )
 
 
-def CreateContent(name, item_type):
+def CreateContent(name, item_type, session=None):
     """Create appropriate content based on item type and name"""
-    print(f"DEBUG: CreateContent called with name='{name}', item_type='{item_type}'")
+    logger.debug('CreateContent name=%r item_type=%r', name, item_type)
 
     if item_type == 'folder':
-        files = FOLDER_CONTENTS.get(
-            name,
-            [
-                Div(
-                    Icon('folder', 'file-icon'),
-                    ' Empty folder',
-                    cls='empty-folder-message',
-                )
-            ],
+        return FolderView(name)
+
+    elif item_type == 'program':
+        builtin = BUILTIN_PROGRAMS.get(name)
+        if builtin is not None:
+            return builtin(), ProgramAssets(BUILTIN_SCRIPTS.get(name, ()))
+
+        program = program_registry.get(name)
+        if program is not None:
+            return (
+                program.get_content(session),
+                ProgramAssets(program.scripts, program.styles),
+            )
+
+        return Div(
+            H3(f'{name}'),
+            P(f'This is the {name} application interface.'),
+            Button('Start', cls='game-btn'),
+            cls='program-content',
         )
+    else:
+        return Div(f'Unknown item type: {item_type}', cls='error-content')
 
+
+def FolderView(name, path=''):
+    """Folder window content - the first page, then more as it scrolls"""
+    try:
+        entries, next_cursor = virtual_fs.page(name, path)
+    except (OSError, ValueError) as e:
+        logger.warning('Folder listing failed', extra={'folder': name, 'path': path})
         return Div(
-            *[Div(file_item, cls='file-item') for file_item in files],
+            Div(
+                Icon('folder', 'file-icon'),
+                f' Cannot open: {e}',
+                cls='empty-folder-message',
+            ),
             cls='file-explorer',
         )
 
-    elif item_type == 'program':
-        if name == 'Game of Life':
-            from programs.game_of_life.components import GameContainer
-            from programs.game_of_life.game import game
-
-            return GameContainer(game)
-        elif name == 'eReader':
-            from programs.ereader.ereader import EReaderProgram
-
-            program = EReaderProgram()
-            return program.get_window_content()
-        elif name == 'Settings':
-            return SystemSettings()
-        elif name == 'Highlights':
-            print('DEBUG: Matched Highlights.txt!')
-            return HighlightsDisplay()
-        else:
-            return Div(
-                H3(f'{name}'),
-                P(f'This is the {name} application interface.'),
-                Button('Start', cls='game-btn'),
-                cls='program-content',
+    items = FolderPage(name, path, entries, next_cursor)
+    if not items:
+        items = [
+            Div(
+                Icon('folder', 'file-icon'), ' Empty folder', cls='empty-folder-message'
             )
-    else:
-        return Div(f'Unknown item type: {item_type}', cls='error-content')
+        ]
+    return Div(
+        *FolderHeader(name, path),
+        Div(*items, cls='file-list'),
+        cls='file-explorer',
+    )
+
+
+def folder_url(name, path='', cursor=None):
+    query = {key: value for key, value in (('path', path), ('cursor', cursor)) if value}
+    url = f'/folder/{quote(name, safe="")}'
+    return f'{url}?{urlencode(query)}' if query else url
+
 
+def FolderHeader(name, path):
+    """Current path and a way up - only mounted folders have subdirectories"""
+    if not virtual_fs.is_mounted(name):
+        return ()
+    header = [Div(f'{name}/{path}', cls='folder-path')]
+    if path:
+        parent = path.rstrip('/').rpartition('/')[0]
+        header.append(FolderLink(name, parent, '📁 ..'))
+    return header
 
-@lru_cache(maxsize=20)
+
+def FolderPage(name, path, entries, next_cursor=None):
+    """One page of entries, plus a loader that fetches the next page"""
+    items = [FolderItem(name, path, entry) for entry in entries]
+    if next_cursor:
+        items.append(LoadMoreFiles(name, path, next_cursor))
+    return items
+
+
+def FolderItem(name, path, entry):
+    """Built-in folders list plain labels, mounts list scanned entries"""
+    if isinstance(entry, str):
+        return Div(entry, cls='file-item')
+    if entry.is_dir:
+        child = f'{path}/{entry.name}' if path else entry.name
+        return FolderLink(name, child, f'📁 {entry.name}/')
+    return Div(
+        Span(f'📄 {entry.name}', cls='file-name'),
+        Span(format_size(entry.size), cls='file-size'),
+        cls='file-item',
+    )
+
+
+def FolderLink(name, path, label):
+    return Div(
+        label,
+        hx_get=folder_url(name, path),
+        hx_target='closest .window-content',
+        cls='file-item',
+    )
+
+
+def LoadMoreFiles(name, path, cursor):
+    """Infinite scroll sentinel - replaced by the next page when scrolled to"""
+    return Div(
+        'Loading...',
+        hx_get=folder_url(name, path, cursor),
+        # The window content scrolls, not the page - revealed would never fire
+        hx_trigger='intersect once',
+        hx_swap='outerHTML',
+        cls='file-load-more',
+    )
+
+
+def format_size(size):
+    if size is None:
+        return ''
+    if size < 1024:
+        return f'{size} B'
+    size /= 1024
+    for unit in ('KB', 'MB'):
+        if size < 1024:
+            return f'{size:.1f} {unit}'
+        size /= 1024
+    return f'{size:.1f} GB'
+
+
+@cached_fragment('icon')
 def cached_icon_content(name: str, item_type: str, is_open: bool):
-    """Cache icon generation using helper function."""
+    """Cache icon symbol and label HTML using helper function."""
     # Use the helper function instead of manual string building
     icon = get_desktop_icon(name, item_type)
 
@@ -151,7 +241,7 @@ def DesktopIcon(name, item_type, oob_update=False):
     x, y = ICON_POSITIONS[name]
 
     # Always pass False for is_open - client handles visual state
-    icon_symbol, icon_label = cached_icon_content(name, item_type, False)
+    icon_content = cached_icon_content(name, item_type, False)
 
     # Create unique ID for this icon
     icon_id = f'icon-{name.replace(" ", "-").lower()}'
@@ -173,19 +263,17 @@ def DesktopIcon(name, item_type, oob_update=False):
     if oob_update:
         attrs['hx_swap_oob'] = 'true'
 
-    return Div(icon_symbol, icon_label, **attrs)
+    return Div(icon_content, **attrs)
 
 
 def Desktop():
     """Create the main desktop layout with icons"""
-    print(f'🔍 DEBUG: Available icons: {list(ICON_POSITIONS.keys())}')
+    logger.debug('Desktop icons: %s', list(ICON_POSITIONS))
 
     return Div(
         # Generate desktop icons from position registry
         *[
-            DesktopIcon(
-                name, 'folder' if name in ['Documents', 'Programs'] else 'program'
-            )
+            DesktopIcon(name, 'folder' if virtual_fs.is_folder(name) else 'program')
             for name in ICON_POSITIONS.keys()
         ],
         cls='desktop-container',
@@ -260,3 +348,13 @@ def HighlightsDisplay():
         Div(id='highlights-list', cls='highlights-content'),
         cls='highlights-viewer',
     )
+
+
+# Programs built into the desktop itself - everything else is in program_registry
+BUILTIN_PROGRAMS = {
+    'Settings': SystemSettings,
+    'Highlights': HighlightsDisplay,
+}
+BUILTIN_SCRIPTS = {
+    'Highlights': ('static/js/highlights-viewer.js',),
+}
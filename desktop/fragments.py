@@ -0,0 +1,141 @@
+"""
+Fragment Cache
+Rendered HTML for FT components, shared by every cached_* helper
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from fasthtml.common import NotStr, to_xml
+
+from desktop.memory import register_cache
+
+# Cache limits
+FRAGMENT_CONFIG = {
+    'MAX_BYTES': 8 * 1024 * 1024,  # Global budget across all namespaces
+}
+
+
+class FragmentCache:
+    """
+    LRU of serialized fragments under one memory budget
+    Entries live in a namespace and may carry tags for targeted invalidation
+    """
+
+    def __init__(self, max_bytes: int = FRAGMENT_CONFIG['MAX_BYTES']):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()  # (namespace, key) -> (html, size, tags)
+        self._tagged = {}  # tag -> set of entry keys
+        self._stats = {}  # namespace -> counters
+        self._lock = threading.Lock()
+
+    def _counters(self, namespace: str) -> dict:
+        counters = self._stats.get(namespace)
+        if counters is None:
+            counters = self._stats[namespace] = dict.fromkeys(
+                ('hits', 'misses', 'evictions', 'entries', 'bytes'), 0
+            )
+        return counters
+
+    def get_or_render(self, namespace: str, key, render, tags=()) -> NotStr:
+        """Cached HTML for key - render() builds the FT on a miss"""
+        entry_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                self._entries.move_to_end(entry_key)
+                self._counters(namespace)['hits'] += 1
+                return entry[0]
+            self._counters(namespace)['misses'] += 1
+
+        # Render outside the lock - a racing duplicate render is harmless
+        markup = to_xml(render())
+        html, size = NotStr(markup), sys.getsizeof(markup)
+        if size > self.max_bytes:
+            return html
+
+        with self._lock:
+            self._remove(entry_key)
+            self._entries[entry_key] = (html, size, tuple(tags))
+            for tag in tags:
+                self._tagged.setdefault(tag, set()).add(entry_key)
+            counters = self._counters(namespace)
+            counters['entries'] += 1
+            counters['bytes'] += size
+            self.size += size
+
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._counters(oldest[0])['evictions'] += 1
+        return html
+
+    def _remove(self, entry_key) -> bool:
+        # Called with the lock held
+        entry = self._entries.pop(entry_key, None)
+        if entry is None:
+            return False
+        _, size, tags = entry
+        for tag in tags:
+            keys = self._tagged.get(tag)
+            if keys is not None:
+                keys.discard(entry_key)
+                if not keys:
+                    del self._tagged[tag]
+        counters = self._counters(entry_key[0])
+        counters['entries'] -= 1
+        counters['bytes'] -= size
+        self.size -= size
+        return True
+
+    def invalidate(self, *tags) -> int:
+        """Drop every entry carrying any of the tags - returns how many"""
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tagged.get(tag, set())
+            return sum(self._remove(entry_key) for entry_key in keys)
+
+    def clear(self, namespace: str = None) -> int:
+        """Drop one namespace, or everything"""
+        with self._lock:
+            keys = [k for k in self._entries if namespace in (None, k[0])]
+            return sum(self._remove(entry_key) for entry_key in keys)
+
+    def stats(self) -> dict:
+        """Per-namespace hit/miss/eviction counters and current sizes"""
+        with self._lock:
+            return {namespace: dict(c) for namespace, c in self._stats.items()}
+
+
+# Global instance
+fragment_cache = FragmentCache()
+register_cache(
+    'fragments', lambda: len(fragment_cache._entries), lambda: fragment_cache._entries
+)
+
+
+def cached_fragment(namespace: str, tags=None):
+    """
+    Cache a component's rendered HTML, keyed by its arguments
+    tags(*args, **kwargs) returns invalidation tags for an entry
+    """
+
+    def decorator(component):
+        @wraps(component)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+            return fragment_cache.get_or_render(
+                namespace,
+                key,
+                lambda: component(*args, **kwargs),
+                tags(*args, **kwargs) if tags else (),
+            )
+
+        wrapper.cache_clear = lambda: fragment_cache.clear(namespace)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,168 @@
+"""
+Structured Logging
+Records are queued by the caller and written by a background thread, so a slow
+or piped stdout never blocks a request. JSON lines by default for ingestion.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+
+def _parse_pairs(spec: str) -> dict:
+    """'desktop.components=DEBUG,main=0.1' -> {'desktop.components': 'DEBUG', ...}"""
+    pairs = {}
+    for item in spec.split(','):
+        name, _, value = item.partition('=')
+        if name.strip() and value.strip():
+            pairs[name.strip()] = value.strip()
+    return pairs
+
+
+LOG_CONFIG = {
+    'LEVEL': os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    'FORMAT': os.environ.get('LOG_FORMAT', 'json'),  # 'json' or 'text'
+    # Per-logger level overrides - LOG_LEVELS='desktop.components=DEBUG'
+    'LEVELS': {
+        'httpx': 'WARNING',  # TestClient logs every request at INFO
+        **_parse_pairs(os.environ.get('LOG_LEVELS', '')),
+    },
+    # Share of sub-WARNING records kept per logger - LOG_SAMPLING='main=0.1'
+    'SAMPLING': {
+        name: float(rate)
+        for name, rate in _parse_pairs(os.environ.get('LOG_SAMPLING', '')).items()
+    },
+    'QUEUE_SIZE': 10_000,  # Records beyond this are dropped, never waited on
+}
+
+TEXT_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+
+# LogRecord attributes that are not user-supplied extra= fields - uvicorn's
+# ANSI-coloured copy of the message included
+_RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {
+    'message',
+    'asctime',
+    'color_message',
+}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line - extra= fields become top-level keys"""
+
+    def format(self, record) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS:
+                entry[key] = value
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class StdoutHandler(logging.StreamHandler):
+    """Writes to sys.stdout as it is at emit time - it may be swapped or wrapped"""
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+    @stream.setter
+    def stream(self, value):
+        pass  # StreamHandler.__init__ assigns it - the lookup above wins
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a share of DEBUG/INFO records per logger - warnings always pass"""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+        self._cache = {}  # logger name -> rate from its nearest configured parent
+
+    def rate(self, name: str) -> float:
+        rate = self._cache.get(name)
+        if rate is None:
+            rate, prefix = 1.0, name
+            while prefix:
+                if prefix in self.rates:
+                    rate = self.rates[prefix]
+                    break
+                prefix = prefix.rpartition('.')[0]
+            self._cache[name] = rate
+        return rate
+
+    def filter(self, record) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rate(record.name)
+        return rate >= 1.0 or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to the writer thread - drops them when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge args now - they may be mutated after the call returns - but
+        # leave all formatting to the writer thread
+        record = copy.copy(record)
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+def setup_logging(config: dict = LOG_CONFIG) -> QueueListener:
+    """Route the root logger through the queue - safe to call more than once"""
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        writer = StdoutHandler()
+        writer.setFormatter(
+            JsonFormatter()
+            if config['FORMAT'] == 'json'
+            else logging.Formatter(TEXT_FORMAT)
+        )
+
+        handler = NonBlockingQueueHandler(queue.Queue(config['QUEUE_SIZE']))
+        if config['SAMPLING']:
+            handler.addFilter(SamplingFilter(config['SAMPLING']))
+
+        root = logging.getLogger()
+        root.setLevel(config['LEVEL'])
+        root.addHandler(handler)
+        for name, level in config['LEVELS'].items():
+            logging.getLogger(name).setLevel(level.upper())
+
+        _listener = QueueListener(handler.queue, writer, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)  # Drain what is queued on exit
+        return _listener
@@ -0,0 +1,139 @@
+"""
+Memory Accounting
+tracemalloc snapshots diffed by file:line, plus live sizes of the app's caches
+"""
+
+import gc
+import os
+import sys
+import threading
+import tracemalloc
+from types import FunctionType, ModuleType
+
+MEMORY_CONFIG = {
+    'TRACEMALLOC_ENABLED': os.environ.get('DEBUG_TRACEMALLOC') == '1',
+    'FRAMES': 1,  # Frames kept per allocation - more is slower but finer grained
+    'TOP': 25,  # Lines returned per snapshot or diff
+}
+
+# Allocations made by the tracer and the import system are noise here
+SNAPSHOT_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+class AllocationTracker:
+    """Starts tracemalloc on demand and diffs snapshots against a baseline"""
+
+    def __init__(self):
+        self.baseline = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return tracemalloc.is_tracing()
+
+    def start(self, frames: int = MEMORY_CONFIG['FRAMES']) -> dict:
+        """Begin tracing and take the baseline - restarts if already running"""
+        with self._lock:
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            tracemalloc.start(frames)
+            self.baseline = self._take()
+        return self.status()
+
+    def stop(self) -> dict:
+        with self._lock:
+            tracemalloc.stop()
+            self.baseline = None
+        return self.status()
+
+    def status(self) -> dict:
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'running': self.running,
+            'traced_bytes': current,
+            'peak_bytes': peak,
+            'overhead_bytes': tracemalloc.get_tracemalloc_memory(),
+        }
+
+    def _take(self):
+        return tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+
+    def snapshot(self, limit: int = MEMORY_CONFIG['TOP']) -> dict:
+        """Largest live allocation sites by file:line"""
+        stats = self._take().statistics('lineno')[:limit]
+        return {
+            **self.status(),
+            'top': [
+                {'where': _where(stat), 'size': stat.size, 'count': stat.count}
+                for stat in stats
+            ],
+        }
+
+    def diff(self, limit: int = MEMORY_CONFIG['TOP']) -> dict:
+        """Growth since the baseline by file:line - leaks sort to the top"""
+        stats = self._take().compare_to(self.baseline, 'lineno')[:limit]
+        return {
+            **self.status(),
+            'top': [
+                {
+                    'where': _where(stat),
+                    'size': stat.size,
+                    'size_diff': stat.size_diff,
+                    'count': stat.count,
+                    'count_diff': stat.count_diff,
+                }
+                for stat in stats
+            ],
+        }
+
+
+def _where(stat) -> str:
+    frame = stat.traceback[0]
+    return f'{frame.filename}:{frame.lineno}'
+
+
+# Global instance
+allocation_tracker = AllocationTracker()
+
+
+# Named caches - modules register themselves so accounting follows lazy loads
+CACHE_REGISTRY = {}  # name -> (entries(), contents() or None)
+
+
+def register_cache(name: str, entries, contents=None):
+    """
+    Report a cache's size - entries() returns its entry count and contents()
+    the container to measure when a deep size is requested
+    """
+    CACHE_REGISTRY[name] = (entries, contents)
+
+
+def deep_sizeof(obj) -> int:
+    """Approximate retained size - shared modules, classes and functions skipped"""
+    seen = set()
+    pending = [obj]
+    size = 0
+    while pending:
+        item = pending.pop()
+        if id(item) in seen or isinstance(item, (type, ModuleType, FunctionType)):
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        pending.extend(gc.get_referents(item))
+    return size
+
+
+def cache_sizes(deep: bool = False) -> dict:
+    """Entry counts for every registered cache, deep byte sizes on request"""
+    sizes = {}
+    for name, (entries, contents) in sorted(CACHE_REGISTRY.items()):
+        report = {'entries': entries()}
+        if deep and contents is not None:
+            report['bytes'] = deep_sizeof(contents())
+        sizes[name] = report
+    return sizes
@@ -0,0 +1,205 @@
+"""
+Request Metrics
+Per-route latency and size histograms in Prometheus text format
+"""
+
+from bisect import bisect_left
+from time import perf_counter_ns
+
+from desktop.fragments import fragment_cache
+
+# Fixed log-spaced bucket bounds - nothing is allocated as traffic grows
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005,
+    0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0,
+)  # fmt: skip
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class Histogram:
+    """Counts per fixed bucket - observe() is a bisect and two adds"""
+
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for count in self.counts:
+            total += count
+            yield total
+
+
+class RouteStats:
+    __slots__ = ('latency', 'size', 'statuses')
+
+    def __init__(self):
+        # Latency is kept in nanoseconds and scaled to seconds on export
+        self.latency = Histogram(tuple(int(b * 1e9) for b in LATENCY_BUCKETS))
+        self.size = Histogram(SIZE_BUCKETS)
+        self.statuses = {}
+
+
+class RequestMetrics:
+    """
+    Per-process request statistics, keyed by method and route template
+    Only touched from the event loop, so plain ints need no locking
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.routes = {}  # (method, route path) -> RouteStats
+        self._route_paths = {}  # endpoint -> route path
+
+    def route_path(self, scope) -> str:
+        """Route template for the matched endpoint - bounded label cardinality"""
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            # Routes can be added after startup (lazy programs) - rescan once
+            for route in scope['app'].router.routes:
+                if hasattr(route, 'endpoint'):
+                    self._route_paths[route.endpoint] = route.path
+            path = self._route_paths.setdefault(endpoint, UNMATCHED_ROUTE)
+        return path
+
+    def observe(self, scope, status: int, size: int, elapsed_ns: int):
+        key = (scope['method'], self.route_path(scope))
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        stats.latency.observe(elapsed_ns)
+        stats.size.observe(size)
+        stats.statuses[status] = stats.statuses.get(status, 0) + 1
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            '# HELP http_requests_in_flight Requests currently being handled',
+            '# TYPE http_requests_in_flight gauge',
+            f'http_requests_in_flight {self.in_flight}',
+            '# HELP http_requests_total Completed requests',
+            '# TYPE http_requests_total counter',
+        ]
+        routes = sorted(self.routes.items())
+        for (method, path), stats in routes:
+            for status, count in sorted(stats.statuses.items()):
+                labels = _labels(method=method, route=path, status=status)
+                lines.append(f'http_requests_total{{{labels}}} {count}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Time to handle a request',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for (method, path), stats in routes:
+            lines += _histogram_lines(
+                'http_request_duration_seconds',
+                _labels(method=method, route=path),
+                stats.latency,
+                LATENCY_BUCKETS,
+                scale=1e-9,
+            )
+
+        lines += [
+            '# HELP http_response_size_bytes Response body size',
+            '# TYPE http_response_size_bytes histogram',
+        ]
+        for (method, path), stats in routes:
+            lines += _histogram_lines(
+                'http_response_size_bytes',
+                _labels(method=method, route=path),
+                stats.size,
+                SIZE_BUCKETS,
+            )
+
+        lines += _fragment_cache_lines()
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(**labels) -> str:
+    escaped = {
+        name: str(value).replace('\\', '\\\\').replace('"', '\\"')
+        for name, value in labels.items()
+    }
+    return ','.join(f'{name}="{value}"' for name, value in escaped.items())
+
+
+def _histogram_lines(name, labels, histogram, buckets, scale=1):
+    lines = []
+    for bound, total in zip((*buckets, '+Inf'), histogram.cumulative(), strict=True):
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram.sum * scale:g}')
+    lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+    return lines
+
+
+def _fragment_cache_lines():
+    stats = fragment_cache.stats()
+    lines = []
+    for counter, kind in (
+        ('hits', 'counter'),
+        ('misses', 'counter'),
+        ('evictions', 'counter'),
+        ('entries', 'gauge'),
+        ('bytes', 'gauge'),
+    ):
+        name = f'fragment_cache_{counter}'
+        if kind == 'counter':
+            name += '_total'
+        lines += [f'# TYPE {name} {kind}']
+        for namespace, counters in sorted(stats.items()):
+            lines.append(
+                f'{name}{{{_labels(namespace=namespace)}}} {counters[counter]}'
+            )
+    return lines
+
+
+class MetricsMiddleware:
+    """ASGI middleware - times every HTTP request into request_metrics"""
+
+    def __init__(self, app, metrics: RequestMetrics = None):
+        self.app = app
+        self.metrics = metrics if metrics is not None else request_metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        metrics = self.metrics
+        response = [500, 0]  # status, body bytes
+        start = perf_counter_ns()
+        metrics.in_flight += 1
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                response[0] = message['status']
+            elif message['type'] == 'http.response.body':
+                response[1] += len(message.get('body', b''))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            metrics.observe(scope, response[0], response[1], perf_counter_ns() - start)
+
+
+# Global instance
+request_metrics = RequestMetrics()
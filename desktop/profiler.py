@@ -0,0 +1,121 @@
+"""
+Sampling Profiler
+Periodic sys._current_frames() snapshots of every thread in the live process
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+PROFILER_CONFIG = {
+    'ENABLED': os.environ.get('DEBUG_PROFILER') == '1',  # Off unless asked for
+    'INTERVAL': 0.005,  # Seconds between samples
+    'MAX_SECONDS': 60,  # Longest profile one request may ask for
+    'MAX_DEPTH': 128,  # Deeper stacks are truncated at the root end
+}
+
+
+class StackSampler:
+    """Counts identical stacks per thread - code objects until export"""
+
+    def __init__(self, interval: float = PROFILER_CONFIG['INTERVAL']):
+        self.interval = interval
+        self.samples = Counter()  # (thread id, (code, ...)) -> count
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='stack-sampler', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        max_depth = PROFILER_CONFIG['MAX_DEPTH']
+        started = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < max_depth:
+                    stack.append(frame.f_code)
+                    frame = frame.f_back
+                stack.reverse()
+                self.samples[(thread_id, tuple(stack))] += 1
+        self.duration = time.perf_counter() - started
+
+    def _thread_names(self) -> dict:
+        return {thread.ident: thread.name for thread in threading.enumerate()}
+
+    def collapsed(self) -> str:
+        """Brendan Gregg folded stacks - one 'thread;outer;inner count' per line"""
+        names = self._thread_names()
+        lines = []
+        for (thread_id, stack), count in self.samples.most_common():
+            frames = [names.get(thread_id, f'thread-{thread_id}')]
+            frames += [_frame_name(code) for code in stack]
+            lines.append(f'{";".join(frames)} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def speedscope(self) -> dict:
+        """Speedscope file format - one sampled profile per thread"""
+        names = self._thread_names()
+        frames, frame_index, profiles = [], {}, {}
+        for (thread_id, stack), count in self.samples.items():
+            indexes = []
+            for code in stack:
+                index = frame_index.get(code)
+                if index is None:
+                    index = frame_index[code] = len(frames)
+                    frames.append(
+                        {
+                            'name': code.co_name,
+                            'file': code.co_filename,
+                            'line': code.co_firstlineno,
+                        }
+                    )
+                indexes.append(index)
+
+            profile = profiles.get(thread_id)
+            if profile is None:
+                profile = profiles[thread_id] = {
+                    'type': 'sampled',
+                    'name': names.get(thread_id, f'thread-{thread_id}'),
+                    'unit': 'seconds',
+                    'startValue': 0,
+                    'endValue': 0,
+                    'samples': [],
+                    'weights': [],
+                }
+            weight = count * self.interval
+            profile['samples'].append(indexes)
+            profile['weights'].append(weight)
+            profile['endValue'] += weight
+
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': f'retro-os {self.duration:.1f}s profile',
+            'exporter': 'retro-os',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': list(profiles.values()),
+        }
+
+
+def _frame_name(code) -> str:
+    filename = os.path.basename(code.co_filename)
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+# Only one profile at a time - sampling overhead should stay bounded
+profile_lock = threading.Lock()
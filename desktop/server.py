@@ -0,0 +1,120 @@
+"""
+Production Server
+Uvicorn workers sized to the machine, on the fastest loop and HTTP parser
+installed, recycled after a request budget or when their RSS grows too large
+"""
+
+import importlib.util
+import logging
+import os
+import random
+import threading
+import time
+
+import psutil
+from uvicorn import Config, Server
+from uvicorn.supervisors import Multiprocess
+
+from desktop.backends import STATE_BACKEND
+
+logger = logging.getLogger(__name__)
+
+SERVER_CONFIG = {
+    'WORKERS': int(os.environ.get('WEB_CONCURRENCY', 0)),  # 0 - one per CPU
+    'KEEP_ALIVE': 15,  # Seconds an idle keep-alive connection is held open
+    'LIMIT_CONCURRENCY': 512,  # Connections per worker before 503s
+    'BACKLOG': 2048,  # Pending connections queued by the kernel
+    'MAX_REQUESTS': int(os.environ.get('MAX_REQUESTS', 10000)),  # 0 - never recycle
+    'MAX_REQUESTS_JITTER': 1000,  # Spread so workers never all recycle together
+    'RSS_LIMIT_MB': int(os.environ.get('RSS_LIMIT_MB', 512)),  # 0 - no watchdog
+    'RSS_CHECK_INTERVAL': 10,  # Seconds between RSS checks
+    'GRACEFUL_TIMEOUT': 30,  # Seconds in-flight requests get on shutdown
+}
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on - respects container CPU sets"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return psutil.cpu_count() or 1
+
+
+def worker_count() -> int:
+    if SERVER_CONFIG['WORKERS']:
+        return SERVER_CONFIG['WORKERS']
+    if STATE_BACKEND == 'memory':
+        # Window state lives in the process - workers would not see each other's
+        logger.warning(
+            'STATE_BACKEND=memory - running one worker; '
+            'use a shared backend or set WEB_CONCURRENCY to scale out'
+        )
+        return 1
+    return available_cpus()
+
+
+def fastest_loop() -> str:
+    return 'uvloop' if importlib.util.find_spec('uvloop') else 'asyncio'
+
+
+def fastest_http() -> str:
+    return 'httptools' if importlib.util.find_spec('httptools') else 'h11'
+
+
+class RecyclingServer(Server):
+    """One worker - exits gracefully past its request budget or RSS limit"""
+
+    def run(self, sockets=None):
+        if self.config.limit_max_requests:
+            jitter = SERVER_CONFIG['MAX_REQUESTS_JITTER']
+            self.config.limit_max_requests += random.randint(0, jitter)
+        if SERVER_CONFIG['RSS_LIMIT_MB']:
+            threading.Thread(
+                target=self._watch_rss, name='rss-watchdog', daemon=True
+            ).start()
+        return super().run(sockets)
+
+    def _watch_rss(self):
+        process = psutil.Process(os.getpid())
+        limit = SERVER_CONFIG['RSS_LIMIT_MB'] * 1024 * 1024
+        while not self.should_exit:
+            time.sleep(SERVER_CONFIG['RSS_CHECK_INTERVAL'])
+            rss = process.memory_info().rss
+            if rss > limit:
+                logger.warning(
+                    'Worker RSS over limit - recycling',
+                    extra={'pid': process.pid, 'rss_bytes': rss, 'limit': limit},
+                )
+                # Same graceful path as limit_max_requests - the supervisor
+                # starts a replacement once this worker has drained
+                self.should_exit = True
+
+
+def serve(app: str = 'main:app', host: str = '0.0.0.0', port: int = 8000):
+    """Run the supervised worker pool until SIGINT/SIGTERM"""
+    config = Config(
+        app,
+        host=host,
+        port=port,
+        workers=worker_count(),
+        loop=fastest_loop(),
+        http=fastest_http(),
+        timeout_keep_alive=SERVER_CONFIG['KEEP_ALIVE'],
+        limit_concurrency=SERVER_CONFIG['LIMIT_CONCURRENCY'],
+        limit_max_requests=SERVER_CONFIG['MAX_REQUESTS'] or None,
+        backlog=SERVER_CONFIG['BACKLOG'],
+        timeout_graceful_shutdown=SERVER_CONFIG['GRACEFUL_TIMEOUT'],
+        log_config=None,  # uvicorn loggers propagate into the queued root logger
+        access_log=True,
+    )
+    logger.info(
+        'Starting production server',
+        extra={
+            'workers': config.workers,
+            'loop': config.loop,
+            'http': config.http,
+            'port': port,
+        },
+    )
+    server = RecyclingServer(config=config)
+    # Always supervised, even with one worker, so a recycled worker is replaced
+    Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
@@ -3,38 +3,66 @@ Desktop Services - Incremental Migration
 Start by wrapping existing logic without changing it
 """
 
+import logging
+
 from desktop.components import CreateContent, DesktopIcon, Window
-from desktop.state import window_manager
+from desktop.state import window_managers
+from desktop.vfs import virtual_fs
+
+logger = logging.getLogger(__name__)
 
 
 class DesktopService:
     def __init__(self):
-        self.window_manager = window_manager
+        self.window_managers = window_managers
 
-    def open_item(self, name: str, type: str, icon_x: int, icon_y: int):
+    def open_item(self, name: str, type: str, icon_x: int, icon_y: int, session=None):
         """Create window content only"""
-        print('🔍 DEBUG desktop_service.open_item: About to call CreateContent')
+        logger.debug('open_item: creating content for %s', name)
 
-        content = CreateContent(name, type)
-        window_data = self.window_manager.create_window(name, content, icon_x, icon_y)
+        window_manager = self.window_managers.get(session)
+        # Only the descriptor is stored - the FT tree is dropped once rendered
+        item_type = 'folder' if virtual_fs.is_folder(name) else 'program'
+        window_record = window_manager.create_window(name, icon_x, icon_y, item_type)
 
-        if window_data is None:
+        if window_record is None:
             return None, None
 
-        window = Window(window_data['name'], content)
+        # Same id as the manager's record, so drags and syncs reach it
+        window = Window(
+            window_record.name,
+            CreateContent(name, type, session),
+            window_id=window_record.id,
+        )
 
         if type == 'folder':
             updated_icon = DesktopIcon(name, type, oob_update=True)
             return window, updated_icon
         return window, None
 
-    def close_window(self, window_id: str):
+    def window_content(self, window_id: str, session=None):
+        """Regenerate an open window's content from its descriptor"""
+        window_record = self.window_managers.get(session).get_window(window_id)
+        if window_record is None:
+            return None
+        item_type, name = window_record.content_descriptor
+        return CreateContent(name, item_type, session)
+
+    def move_window(self, window_id: str, x: int, y: int, session=None):
+        """Record a dragged window's position"""
+        return self.window_managers.get(session).update_window_position(window_id, x, y)
+
+    def sync_windows(self, changes: list, session=None):
+        """Apply a coalesced batch of client window changes"""
+        return self.window_managers.get(session).apply_changes(changes)
+
+    def close_window(self, window_id: str, session=None):
         """Clean up server data only"""
-        closed_window_data = self.window_manager.close_window(window_id)
+        closed_window = self.window_managers.get(session).close_window(window_id)
 
-        if closed_window_data and closed_window_data.get('item_type') == 'folder':
+        if closed_window is not None and closed_window.item_type == 'folder':
             # The folder state is now closed, return updated icon
-            return DesktopIcon(closed_window_data['name'], 'folder', oob_update=True)
+            return DesktopIcon(closed_window.name, 'folder', oob_update=True)
         return None
 
 
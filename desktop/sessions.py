@@ -0,0 +1,118 @@
+"""
+Session Registry
+Per-session objects kept in a bounded LRU with idle eviction
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from uuid import uuid4
+
+from desktop.backends import SyncedState
+
+SESSION_KEY = 'sid'
+
+# Registry limits
+SESSION_CONFIG = {
+    'MAX_SESSIONS': 1000,  # Least recently used sessions are dropped past this
+    'IDLE_TIMEOUT': 30 * 60,  # Seconds without a request before eviction
+}
+
+
+def get_session_id(session) -> str:
+    """Stable ID for a browser session - assigned on first use"""
+    if session is None:
+        return ''
+    sid = session.get(SESSION_KEY)
+    if not sid:
+        sid = uuid4().hex
+        session[SESSION_KEY] = sid
+    return sid
+
+
+class SessionRegistry:
+    """
+    Lazily creates one object per session, evicting idle and excess entries
+    With a shared backend, objects are mirrored under namespace:sid so any
+    worker can pick a session up - they need dump_state/load_state/on_change
+    """
+
+    def __init__(
+        self,
+        factory,
+        max_sessions: int = SESSION_CONFIG['MAX_SESSIONS'],
+        idle_timeout: float = SESSION_CONFIG['IDLE_TIMEOUT'],
+        backend=None,
+        namespace: str = None,
+    ):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.namespace = namespace
+        self.backend = backend if backend is not None and backend.shared else None
+        self._entries = OrderedDict()  # sid -> [obj, last_used, synced], oldest first
+        self._lock = threading.Lock()
+
+    def get(self, session):
+        """Object for this request's session - a throwaway one without a session"""
+        if session is None:
+            return self.factory()
+        return self.get_by_id(get_session_id(session))
+
+    def get_by_id(self, sid: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                entry = [self.factory(), now, None]
+                if self.backend is not None:
+                    entry[2] = SyncedState(
+                        self.backend,
+                        f'{self.namespace}:{sid}',
+                        entry[0],
+                        ttl=self.idle_timeout,
+                    )
+                    entry[0].on_change = entry[2].save
+                self._entries[sid] = entry
+            else:
+                entry[1] = now
+                self._entries.move_to_end(sid)
+            self._evict(now)
+
+        # Pick up changes another worker made to this session
+        if entry[2] is not None:
+            entry[2].load()
+        return entry[0]
+
+    def discard(self, sid: str):
+        with self._lock:
+            entry = self._entries.pop(sid, None)
+        return entry[0] if entry else None
+
+    def evict_idle(self):
+        """Drop idle sessions now - returns how many were evicted"""
+        with self._lock:
+            return self._evict(time.monotonic())
+
+    def _evict(self, now: float) -> int:
+        # Entries are in recency order, so idle ones are all at the front
+        evicted = 0
+        while self._entries:
+            last_used = next(iter(self._entries.values()))[1]
+            idle = now - last_used > self.idle_timeout
+            if not idle and len(self._entries) <= self.max_sessions:
+                break
+            self._entries.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def objects(self) -> list:
+        """Snapshot of every live per-session object"""
+        with self._lock:
+            return [entry[0] for entry in self._entries.values()]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, sid):
+        return sid in self._entries
@@ -0,0 +1,122 @@
+"""
+Desktop Shell
+The landing page rendered once per config version and served as cached bytes
+"""
+
+import hashlib
+import json
+import threading
+from urllib.parse import urlsplit
+
+from fasthtml.common import Link, Response, Title, is_full_page, respond, to_xml
+from starlette.requests import Request
+
+from desktop.components import Desktop
+from desktop.memory import register_cache
+from desktop.state import ICON_POSITIONS
+from desktop.themes import request_theme, theme_url
+
+# Shell cache limits
+SHELL_CONFIG = {
+    'MAX_PAGES': 128,  # Distinct URL and theme renders kept before a reset
+    'CACHE_CONTROL': 'no-cache',  # Always revalidate - the ETag makes it cheap
+}
+
+
+def shell_config_version() -> str:
+    """Hash of everything the desktop shell is rendered from"""
+    config = json.dumps(ICON_POSITIONS, sort_keys=True)
+    return hashlib.sha1(config.encode()).hexdigest()[:12]
+
+
+class DesktopShell:
+    """Serves the pre-rendered desktop - full page or htmx fragment"""
+
+    def __init__(self, render=Desktop, max_pages: int = SHELL_CONFIG['MAX_PAGES']):
+        self.render = render
+        self.max_pages = max_pages
+        self.version = shell_config_version()
+        self._pages = {}  # (version, canonical url, partial, theme) -> (body, etag)
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Drop every render - call after changing the desktop configuration"""
+        with self._lock:
+            self.version = shell_config_version()
+            self._pages.clear()
+
+    def response(self, request) -> Response:
+        """Cached shell for this request, or 304 when the client already has it"""
+        body, etag = self.page(request)
+        headers = {
+            'ETag': etag,
+            'Cache-Control': SHELL_CONFIG['CACHE_CONTROL'],
+            'Vary': 'HX-Request, HX-History-Restore-Request, Cookie',
+        }
+        if etag in request.headers.get('if-none-match', ''):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type='text/html', headers=headers)
+
+    def page(self, request) -> tuple[bytes, str]:
+        partial = is_full_page(request, ())
+        # The query string never changes the shell - keep it out of the key
+        canonical = str(request.url.replace(query=''))
+        # Fragments have no head - only full pages link the theme stylesheet
+        theme = None if partial else request_theme(request)
+        key = (self.version, canonical, partial, theme)
+
+        cached = self._pages.get(key)
+        if cached is None:
+            body = self._render(request, canonical, theme).encode('utf-8')
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            cached = (body, etag)
+            with self._lock:
+                if len(self._pages) >= self.max_pages:
+                    self._pages.clear()
+                self._pages[key] = cached
+        return cached
+
+    def prerender(self, app, url: str) -> tuple[bytes, str]:
+        """
+        Cache the full page for a public URL before anyone requests it
+        Rendered from a bare request - no middleware, session or metrics run
+        """
+        parts = urlsplit(url)
+        request = Request(
+            {
+                'type': 'http',
+                'app': app,
+                'method': 'GET',
+                'scheme': parts.scheme or 'http',
+                'path': parts.path or '/',
+                'query_string': b'',
+                'headers': [(b'host', parts.netloc.encode())],
+            }
+        )
+        # What FastHTML attaches to a request before calling a route
+        request.hdrs, request.ftrs = list(app.hdrs), list(app.ftrs)
+        request.htmlkw, request.bodykw = app.htmlkw, app.bodykw
+        request.body_wrap = app.body_wrap
+        return self.page(request)
+
+    def _render(self, request, canonical: str, theme) -> str:
+        # Same document FastHTML builds for an FT response, minus the per-hit cost
+        content = self.render()
+        if theme is None:
+            return to_xml(content)
+
+        app = request.app
+        heads = [
+            Title(app.title),
+            Link(rel='stylesheet', href=theme_url(*theme), id='theme-stylesheet'),
+        ]
+        if app.canonical:
+            heads.append(Link(rel='canonical', href=canonical))
+        return to_xml(respond(request, heads, (content,)))
+
+
+# Global instance
+desktop_shell = DesktopShell()
+register_cache(
+    'desktop_shell', lambda: len(desktop_shell._pages), lambda: desktop_shell._pages
+)
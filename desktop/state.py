@@ -3,7 +3,14 @@ Desktop State Management
 Handles all window lifecycle, positioning, and folder state
 """
 
-from dataclasses import dataclass
+import heapq
+import threading
+from dataclasses import asdict, dataclass
+from functools import wraps
+
+from desktop.backends import SyncedState, state_backend
+from desktop.memory import register_cache
+from desktop.sessions import SessionRegistry
 
 # Configuration constants
 ICON_POSITIONS = {
@@ -24,16 +31,29 @@ class DesktopSettings:
 
 
 class SettingsManager:
-    def __init__(self):
+    def __init__(self, backend=None):
         self.settings = DesktopSettings()
+        self.synced = SyncedState(backend, 'settings', self) if backend else None
 
     def get_setting(self, key: str):
+        if self.synced:
+            self.synced.load()
         return getattr(self.settings, key)
 
     def update_setting(self, key: str, value):
         setattr(self.settings, key, value)
+        if self.synced:
+            self.synced.save()
+
+    def dump_state(self):
+        return asdict(self.settings)
+
+    def load_state(self, data):
+        self.settings = DesktopSettings(**data)
 
     def get_all(self):
+        if self.synced:
+            self.synced.load()
         return {
             'theme_color': self.settings.theme_color,
             'font': self.settings.font,
@@ -42,7 +62,7 @@ class SettingsManager:
 
 
 # Global instance
-settings_manager = SettingsManager()
+settings_manager = SettingsManager(state_backend)
 
 
 FOLDER_CONTENTS = {
@@ -68,24 +88,28 @@ FOLDER_CONTENTS = {
 THEME_COLORS = {
     # Existing themes
     'green': {
+        'hue': 120,  # Icon hue-rotate filters
         'primary': '#00ff41',
         'primary_dim': '#00ff4155',
         'primary_glow': '#00ff4108',
         'primary_dark': '#008822',
     },
     'cyan': {
+        'hue': 180,
         'primary': '#00ffff',
         'primary_dim': '#00ffff55',
         'primary_glow': '#00ffff08',
         'primary_dark': '#008888',
     },
     'amber': {
+        'hue': 45,
         'primary': '#ffbf00',
         'primary_dim': '#ffbf0055',
         'primary_glow': '#ffbf0008',
         'primary_dark': '#cc8800',
     },
     'purple': {
+        'hue': 270,
         'primary': '#8a2be2',
         'primary_dim': '#8a2be255',
         'primary_glow': '#8a2be208',
@@ -93,36 +117,42 @@ THEME_COLORS = {
     },
     # NEW THEMES - ADD THESE:
     'red': {
+        'hue': 348,
         'primary': '#ff2040',
         'primary_dim': '#ff204055',
         'primary_glow': '#ff204008',
         'primary_dark': '#cc1833',
     },
     'orange': {
+        'hue': 24,
         'primary': '#ff6600',
         'primary_dim': '#ff660055',
         'primary_glow': '#ff660008',
         'primary_dark': '#cc5200',
     },
     'pink': {
+        'hue': 328,
         'primary': '#ff1493',
         'primary_dim': '#ff149355',
         'primary_glow': '#ff149308',
         'primary_dark': '#cc1075',
     },
     'lime': {
+        'hue': 120,
         'primary': '#32cd32',
         'primary_dim': '#32cd3255',
         'primary_glow': '#32cd3208',
         'primary_dark': '#28a428',
     },
     'blue': {
+        'hue': 210,
         'primary': '#0080ff',
         'primary_dim': '#0080ff55',
         'primary_glow': '#0080ff08',
         'primary_dark': '#0066cc',
     },
     'white': {
+        'hue': 0,
         'primary': '#ffffff',
         'primary_dim': '#ffffff55',
         'primary_glow': '#ffffff08',
@@ -134,6 +164,12 @@ SYSTEM_FONTS = {
     'courier': "'Courier New', monospace",
     'monaco': "'Monaco', monospace",
     'consolas': "'Consolas', monospace",
+    'fira': "'Fira Code', 'Courier New', monospace",
+    'ubuntu': "'Ubuntu Mono', 'Courier New', monospace",
+    'source': "'Source Code Pro', 'Courier New', monospace",
+    'jetbrains': "'JetBrains Mono', 'Courier New', monospace",
+    'roboto': "'Roboto Mono', 'Courier New', monospace",
+    'inconsolata': "'Inconsolata', 'Courier New', monospace",
 }
 
 
@@ -144,6 +180,8 @@ WINDOW_CONFIG = {
     'WINDOW_OFFSET_Y': 50,  # Vertical offset from icon to window
     'INITIAL_Z_INDEX': 100,  # Starting z-index for windows
     'MAX_MINIMIZED': 10,  # Maximum minimized windows in taskbar
+    'MAX_SYNC_CHANGES': 64,  # Window changes accepted per sync batch
+    'Z_COMPACT_SPAN': 1000,  # z-index growth allowed before renumbering
 }
 
 # Taskbar configuration
@@ -154,20 +192,173 @@ TASKBAR_CONFIG = {
 }
 
 
+class WindowRecord:
+    """
+    One open window - slots keep per-window memory flat. Content is not kept:
+    (item_type, name) describes it and CreateContent regenerates it on demand
+    """
+
+    __slots__ = ('id', 'name', 'x', 'y', 'maximized', 'item_type')
+
+    def __init__(self, window_id, name, x, y, maximized=False, item_type='program'):
+        self.id = window_id
+        self.name = name
+        self.x = x
+        self.y = y
+        self.maximized = maximized
+        self.item_type = item_type
+
+    @property
+    def position(self):
+        return (self.x, self.y)
+
+    @property
+    def content_descriptor(self) -> tuple:
+        """What CreateContent needs to rebuild this window's content"""
+        return (self.item_type, self.name)
+
+    def to_row(self) -> list:
+        """Compact persisted form"""
+        return [self.id, self.name, self.x, self.y, self.maximized, self.item_type]
+
+    @classmethod
+    def from_row(cls, row):
+        window_id, name, x, y, maximized, item_type = row
+        return cls(window_id, name, x, y, maximized, item_type)
+
+
+class SlotAllocator:
+    """Lowest free taskbar slot first - a min-heap, O(log n) per operation"""
+
+    __slots__ = ('_free',)
+
+    def __init__(self, size: int, used=()):
+        used = set(used)
+        # Ascending order is already a valid heap
+        self._free = [slot for slot in range(size) if slot not in used]
+
+    def acquire(self):
+        """Lowest free slot - None when every slot is taken"""
+        return heapq.heappop(self._free) if self._free else None
+
+    def release(self, slot: int):
+        heapq.heappush(self._free, slot)
+
+    def __len__(self):
+        return len(self._free)
+
+
+class ZOrder:
+    """
+    Stacking order, bottom first - raise-to-top is O(1) and z values are
+    renumbered from the base once they drift far above the window count
+    """
+
+    __slots__ = ('base', 'span', '_z', '_next')
+
+    def __init__(
+        self,
+        base: int = WINDOW_CONFIG['INITIAL_Z_INDEX'],
+        span: int = WINDOW_CONFIG['Z_COMPACT_SPAN'],
+    ):
+        self.base = base
+        self.span = span
+        self._z = {}  # window id -> z, dict order is stacking order
+        self._next = base
+
+    def raise_to_top(self, window_id) -> int:
+        self._z.pop(window_id, None)
+        # Amortised - at least span raises happen between compactions
+        if self._next - self.base >= max(self.span, 2 * len(self._z)):
+            self.compact()
+        z = self._z[window_id] = self._next
+        self._next += 1
+        return z
+
+    def remove(self, window_id):
+        self._z.pop(window_id, None)
+
+    def z(self, window_id):
+        return self._z.get(window_id)
+
+    def compact(self):
+        """Renumber bottom to top from the base - order is unchanged"""
+        self._z = {window_id: self.base + i for i, window_id in enumerate(self._z)}
+        self._next = self.base + len(self._z)
+
+    def clear(self):
+        self._z.clear()
+        self._next = self.base
+
+    def __iter__(self):
+        return iter(self._z)
+
+    def __len__(self):
+        return len(self._z)
+
+
+def window_id_for(name):
+    """DOM id and manager key of a desktop item's window - one per name"""
+    return f'win-{name.replace(" ", "-").lower()}'
+
+
+def parse_window_changes(changes):
+    """
+    Validate and normalise a client sync batch before any of it is applied -
+    raises ValueError so a bad patch never leaves the batch half done
+    """
+    if not isinstance(changes, list):
+        raise ValueError('changes must be a list')
+    parsed = []
+    for change in changes[: WINDOW_CONFIG['MAX_SYNC_CHANGES']]:
+        if not isinstance(change, dict) or not isinstance(change.get('id'), str):
+            raise ValueError(f'invalid window change: {change!r}')
+        patch = {'id': change['id']}
+        if 'position' in change:
+            try:
+                x, y = change['position']
+                patch['position'] = (int(x), int(y))
+            except (TypeError, ValueError):
+                raise ValueError(f'invalid position: {change["position"]!r}') from None
+        for flag in ('minimized', 'maximized', 'focused', 'closed'):
+            if flag in change:
+                if not isinstance(change[flag], bool):
+                    raise ValueError(f'{flag} must be a boolean')
+                patch[flag] = change[flag]
+        parsed.append(patch)
+    return parsed
+
+
+def _locked(method):
+    """Run a WindowManager mutation under its lock, then report the change"""
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            result = method(self, *args, **kwargs)
+            if self.on_change is not None:
+                self.on_change()
+            return result
+
+    return wrapper
+
+
 class WindowManager:
-    """Central state manager for all desktop windows"""
+    """Window state for one desktop session"""
 
     def __init__(self):
-        self.windows = {}
-        self.minimized_positions = {}
-        self.available_positions = set(range(WINDOW_CONFIG['MAX_MINIMIZED']))
-        self.next_z_index = WINDOW_CONFIG['INITIAL_Z_INDEX']
+        self._lock = threading.RLock()
+        self.on_change = None  # Set by the registry when state is shared
+        self.windows = {}  # window id -> WindowRecord
+        self.minimized_positions = {}  # window id -> taskbar slot
+        self.taskbar_slots = SlotAllocator(WINDOW_CONFIG['MAX_MINIMIZED'])
+        self.z_order = ZOrder()
         self.open_folders = set()
-        self._reset_desktop()
 
-    def create_window(self, name, content, icon_x, icon_y):
-        """Creates a window and returns the complete window data structure"""
-        window_id = f'win-{name.replace(" ", "-").lower()}'
+    @_locked
+    def create_window(self, name, icon_x, icon_y, item_type='program'):
+        """Creates a window and returns its record"""
+        window_id = window_id_for(name)
 
         # Check if window already exists
         if window_id in self.windows:
@@ -177,80 +368,129 @@ class WindowManager:
         base_x = min(icon_x * 100 + 50, 50)  # Never more than 50px from left
         base_y = min(icon_y * 80 + 30, 80)  # Stagger vertically, max 80px from top
 
-        # Create window data structure
-        window_data = {
-            'id': window_id,
-            'name': name,
-            'content': content,
-            'position': (base_x, base_y),
-            'z_index': self.next_z_index,
-            'maximized': False,
-            'item_type': 'folder' if name in ['Documents', 'Programs'] else 'program',
-        }
-
-        # Store in windows registry
-        self.windows[window_id] = window_data
-        self.next_z_index += 1
+        window = WindowRecord(
+            window_id,
+            name,
+            base_x,
+            base_y,
+            item_type=item_type,
+        )
+        self.windows[window_id] = window
+        self.z_order.raise_to_top(window_id)
 
         # Track folder state if this is a folder
-        if window_data['item_type'] == 'folder':
+        if window.item_type == 'folder':
             self.open_folders.add(name)
 
-        return window_data
+        return window
 
     def get_window(self, window_id):
-        """Get window data by ID"""
+        """Get window record by ID"""
         return self.windows.get(window_id)
 
+    def z_index(self, window_id):
+        return self.z_order.z(window_id)
+
+    @_locked
     def minimize_window(self, window_id):
         """Minimize window and return position in taskbar"""
-        if window_id not in self.windows or not self.available_positions:
+        if window_id not in self.windows:
             return None
-        position = min(self.available_positions)
-        self.available_positions.remove(position)
-        self.minimized_positions[window_id] = position
+        if window_id in self.minimized_positions:
+            return self.minimized_positions[window_id]
+        position = self.taskbar_slots.acquire()
+        if position is not None:
+            self.minimized_positions[window_id] = position
         return position
 
+    def _release_slot(self, window_id):
+        position = self.minimized_positions.pop(window_id, None)
+        if position is not None:
+            self.taskbar_slots.release(position)
+
+    @_locked
     def restore_window(self, window_id):
         """Restore minimized window"""
-        if window_id in self.minimized_positions:
-            pos = self.minimized_positions.pop(window_id)
-            self.available_positions.add(pos)
-        if window_id in self.windows:
-            self.windows[window_id]['maximized'] = False
-        return self.windows.get(window_id)
+        self._release_slot(window_id)
+        window = self.windows.get(window_id)
+        if window is not None:
+            window.maximized = False
+        return window
 
+    @_locked
     def maximize_window(self, window_id):
         """Maximize window"""
-        if window_id in self.windows:
-            self.windows[window_id]['maximized'] = True
-        return self.windows.get(window_id)
+        window = self.windows.get(window_id)
+        if window is not None:
+            window.maximized = True
+        return window
 
+    @_locked
     def close_window(self, window_id):
         """Close window and clean up state"""
-        # Clean up minimized position if exists
-        if window_id in self.minimized_positions:
-            pos = self.minimized_positions.pop(window_id)
-            self.available_positions.add(pos)
-
-        # Get window data before deletion
-        window_data = self.windows.get(window_id)
-        if window_data and window_data.get('item_type') == 'folder':
-            self.close_folder(window_data['name'])
+        self._release_slot(window_id)
+        self.z_order.remove(window_id)
 
-        # Remove from windows registry
-        self.windows.pop(window_id, None)
-        return window_data
+        window = self.windows.pop(window_id, None)
+        if window is not None and window.item_type == 'folder':
+            self.close_folder(window.name)
+        return window
 
+    @_locked
     def update_window_position(self, window_id, x, y):
         """Update window position (for dragging)"""
-        if window_id in self.windows:
-            self.windows[window_id]['position'] = (x, y)
-
+        window = self.windows.get(window_id)
+        if window is None:
+            return False
+        window.x, window.y = x, y
+        return True
+
+    @_locked
+    def apply_changes(self, changes):
+        """
+        Apply a batch of client window patches in one pass - each patch is
+        {'id', 'position'?, 'minimized'?, 'maximized'?, 'focused'?, 'closed'?}
+        and the client has already coalesced them to the latest per window.
+        The whole batch is validated first: ValueError means nothing changed.
+        """
+        changes = parse_window_changes(changes)
+
+        # One change notification for the whole batch, not one per operation
+        on_change, self.on_change = self.on_change, None
+        applied = 0
+        try:
+            for change in changes:
+                window_id = change['id']
+                window = self.windows.get(window_id)
+                if window is None:
+                    continue
+                if change.get('closed'):
+                    self.close_window(window_id)
+                    applied += 1
+                    continue
+
+                if 'position' in change:
+                    window.x, window.y = change['position']
+                if change.get('minimized') is True:
+                    self.minimize_window(window_id)
+                elif change.get('minimized') is False:
+                    # Taskbar slot only - the client keeps its maximized state
+                    self._release_slot(window_id)
+                if 'maximized' in change:
+                    window.maximized = change['maximized']
+                if change.get('focused'):
+                    self.z_order.raise_to_top(window_id)
+                applied += 1
+        finally:
+            self.on_change = on_change
+        return applied
+
+    @_locked
     def open_folder(self, name):
         """Mark folder as open"""
         self.open_folders.add(name)
 
+    @_locked
     def close_folder(self, name):
         """Mark folder as closed"""
         self.open_folders.discard(name)
@@ -259,6 +499,47 @@ class WindowManager:
         """Check if folder is currently open"""
         return name in self.open_folders
 
+    def dump_state(self):
+        """JSON-safe snapshot - window rows bottom to top, so z is implied"""
+        with self._lock:
+            return {
+                'v': 2,
+                'windows': [
+                    self.windows[window_id].to_row() for window_id in self.z_order
+                ],
+                'minimized': self.minimized_positions,
+                'open_folders': sorted(self.open_folders),
+            }
+
+    def load_state(self, data):
+        with self._lock:
+            if data.get('v') == 2:
+                records = [WindowRecord.from_row(row) for row in data['windows']]
+                minimized = data['minimized']
+            else:
+                # Dict-per-window snapshots written before the compact format
+                records = [
+                    WindowRecord(
+                        window['id'],
+                        window['name'],
+                        *window['position'],
+                        window['maximized'],
+                        window['item_type'],
+                    )
+                    for window in sorted(data['windows'], key=lambda w: w['z_index'])
+                ]
+                minimized = data['minimized_positions']
+
+            self.windows = {window.id: window for window in records}
+            self.z_order.clear()
+            for window in records:
+                self.z_order.raise_to_top(window.id)
+            self.minimized_positions = dict(minimized)
+            self.taskbar_slots = SlotAllocator(
+                WINDOW_CONFIG['MAX_MINIMIZED'], self.minimized_positions.values()
+            )
+            self.open_folders = set(data['open_folders'])
+
     def calculate_taskbar_position(self, position):
         """Calculate taskbar position for minimized window"""
         return (
@@ -267,15 +548,23 @@ class WindowManager:
             + (position * TASKBAR_CONFIG['ITEM_HEIGHT']),
         )
 
-    def _reset_desktop(self):
-        """Reset all desktop state on startup"""
+    @_locked
+    def reset_desktop(self):
+        """Reset this session's desktop - all windows closed"""
         self.windows.clear()
         self.minimized_positions.clear()
-        self.available_positions = set(range(WINDOW_CONFIG['MAX_MINIMIZED']))
-        self.next_z_index = WINDOW_CONFIG['INITIAL_Z_INDEX']
+        self.taskbar_slots = SlotAllocator(WINDOW_CONFIG['MAX_MINIMIZED'])
+        self.z_order.clear()
         self.open_folders.clear()
-        print('Desktop state reset - all windows closed')
 
 
-# Global state instance
-window_manager = WindowManager()
+# Session-scoped window state - one WindowManager per browser session
+window_managers = SessionRegistry(
+    WindowManager, backend=state_backend, namespace='windows'
+)
+register_cache('window_sessions', window_managers.__len__, window_managers.objects)
+register_cache(
+    'windows',
+    lambda: sum(len(wm.windows) for wm in window_managers.objects()),
+    lambda: [wm.windows for wm in window_managers.objects()],
+)
@@ -0,0 +1,59 @@
+"""
+Theme Stylesheets
+One small generated stylesheet per theme/font pair, fingerprinted and cached
+forever by the asset pipeline so the first paint is already themed
+"""
+
+from desktop.assets import asset_pipeline, asset_url
+from desktop.state import SYSTEM_FONTS, THEME_COLORS, DesktopSettings
+
+THEME_CONFIG = {
+    'DIR': 'themes',  # Virtual asset directory - nothing is written to disk
+    'THEME_COOKIE': 'retro-os-theme_color',  # Mirrors settings-manager.js keys
+    'FONT_COOKIE': 'retro-os-font',
+}
+
+
+def theme_path(theme: str, font: str) -> str:
+    return f'{THEME_CONFIG["DIR"]}/{theme}-{font}.css'
+
+
+def theme_css(theme: str, font: str) -> str:
+    colors = THEME_COLORS[theme]
+    # html:root outranks style.css's :root whichever order the sheets load in
+    return (
+        'html:root {\n'
+        f'    --primary-hue: {colors["hue"]};\n'
+        f'    --primary-color: {colors["primary"]};\n'
+        f'    --primary-dim: {colors["primary_dim"]};\n'
+        f'    --primary-dark: {colors["primary_dark"]};\n'
+        f'    --system-font: {SYSTEM_FONTS[font]};\n'
+        '}\n'
+    )
+
+
+def build_theme_assets() -> dict:
+    """Every theme/font combination - {asset path: css bytes}"""
+    return {
+        theme_path(theme, font): theme_css(theme, font).encode('utf-8')
+        for theme in THEME_COLORS
+        for font in SYSTEM_FONTS
+    }
+
+
+def request_theme(request) -> tuple[str, str]:
+    """Theme and font from the settings cookies - defaults for unknown values"""
+    defaults = DesktopSettings()
+    theme = request.cookies.get(THEME_CONFIG['THEME_COOKIE'], '').strip('"')
+    font = request.cookies.get(THEME_CONFIG['FONT_COOKIE'], '').strip('"')
+    return (
+        theme if theme in THEME_COLORS else defaults.theme_color,
+        font if font in SYSTEM_FONTS else defaults.font,
+    )
+
+
+def theme_url(theme: str, font: str) -> str:
+    return asset_url(theme_path(theme, font))
+
+
+asset_pipeline.add_generator(build_theme_assets)
@@ -3,6 +3,8 @@
 
 from fasthtml.common import Button, NotStr, Option
 
+from desktop.assets import asset_url
+
 
 def create_icon(
     name: str, size: int = None, alt: str = None, cls: str = 'icon-svg'
@@ -11,9 +13,8 @@ def create_icon(
     alt_text = alt or name.replace('-', ' ').title()
     style = f' style="width: {size}px; height: {size}px;"' if size else ''
 
-    return NotStr(
-        f'<img src="/static/icons/{name}.svg" alt="{alt_text}" class="{cls}"{style}>'
-    )
+    src = asset_url(f'static/icons/{name}.svg')
+    return NotStr(f'<img src="{src}" alt="{alt_text}" class="{cls}"{style}>')
 
 
 def window_control_icon(icon_type: str, size: int = 16) -> NotStr:
@@ -25,7 +26,7 @@ def window_control_icon(icon_type: str, size: int = 16) -> NotStr:
         'window': '/static/icons/window.svg',
     }
 
-    path = paths.get(icon_type, paths['window'])
+    path = asset_url(paths.get(icon_type, paths['window']))
     style = f'width: {size}px; height: {size}px;'
 
     return NotStr(
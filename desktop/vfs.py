@@ -0,0 +1,226 @@
+"""
+Virtual Filesystem
+Folder windows list the built-in folders and mounted real directories a page
+at a time. Directories are read lazily through os.scandir, so the first page of
+a 100k-entry folder costs the same as a 10-entry one.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+from desktop.memory import register_cache
+from desktop.state import FOLDER_CONTENTS, ICON_POSITIONS
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_mounts(spec: str) -> dict:
+    """'Files=/srv/files,Logs=~/logs' -> {'Files': '/srv/files', ...}"""
+    mounts = {}
+    for item in spec.split(','):
+        name, _, path = item.partition('=')
+        if name.strip() and path.strip():
+            mounts[name.strip()] = os.path.expanduser(path.strip())
+    return mounts
+
+
+VFS_CONFIG = {
+    # Desktop folder name -> real directory - VFS_MOUNTS='Files=/srv/files'
+    'MOUNTS': _parse_mounts(os.environ.get('VFS_MOUNTS', '')),
+    'PAGE_SIZE': 50,  # Entries per page - the rest load as the list scrolls
+    'MAX_LISTINGS': 64,  # Directory listings cached before the oldest is closed
+    'ICON_COLUMNS': 3,  # Desktop grid columns searched for a mount's icon
+}
+
+
+class Entry(NamedTuple):
+    name: str
+    is_dir: bool
+    size: int | None  # None for directories and entries that could not be stat'd
+
+
+class Listing:
+    """One directory as of one mtime - scandir is read only as far as pages ask"""
+
+    def __init__(self, path: str, mtime_ns: int):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.entries = []
+        self._scan = os.scandir(path)
+        self._lock = threading.Lock()
+
+    def page(self, offset: int, limit: int) -> tuple[list, bool]:
+        """Entries [offset, offset + limit) and whether any follow them"""
+        self._read_to(offset + limit + 1)
+        return self.entries[offset : offset + limit], len(self.entries) > offset + limit
+
+    def _read_to(self, count: int):
+        with self._lock:
+            while self._scan is not None and len(self.entries) < count:
+                try:
+                    item = next(self._scan)
+                except StopIteration:
+                    self._close()
+                    break
+                except OSError:
+                    logger.warning('Directory read failed', extra={'path': self.path})
+                    self._close()
+                    break
+                self.entries.append(self._entry(item))
+
+    @staticmethod
+    def _entry(item: os.DirEntry) -> Entry:
+        # d_type makes is_dir free on most filesystems - only files cost a stat
+        try:
+            if item.is_dir():
+                return Entry(item.name, True, None)
+            return Entry(item.name, False, item.stat().st_size)
+        except OSError:  # Removed since the scan, or a dangling symlink
+            return Entry(item.name, False, None)
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        if self._scan is not None:
+            self._scan.close()
+            self._scan = None
+
+
+class StatCache:
+    """
+    Directory listings with their entries' stat results, keyed by path
+    A listing is dropped once its directory's mtime moves - files added,
+    removed or renamed. In-place writes do not touch it, so sizes can lag.
+    """
+
+    def __init__(self, max_listings: int = VFS_CONFIG['MAX_LISTINGS']):
+        self.max_listings = max_listings
+        self._listings = OrderedDict()  # real path -> Listing, oldest first
+        self._lock = threading.Lock()
+
+    def listing(self, path: str) -> Listing:
+        mtime_ns = os.stat(path).st_mtime_ns
+        with self._lock:
+            listing = self._listings.get(path)
+            if listing is not None and listing.mtime_ns == mtime_ns:
+                self._listings.move_to_end(path)
+                return listing
+            if listing is not None:
+                listing.close()
+
+            listing = Listing(path, mtime_ns)
+            self._listings[path] = listing
+            # Each unfinished listing holds a directory handle open
+            while len(self._listings) > self.max_listings:
+                _, oldest = self._listings.popitem(last=False)
+                oldest.close()
+            return listing
+
+    def clear(self):
+        with self._lock:
+            for listing in self._listings.values():
+                listing.close()
+            self._listings.clear()
+
+    def __len__(self):
+        return len(self._listings)
+
+
+def encode_cursor(token: int, offset: int) -> str:
+    return f'{token}-{offset}'
+
+
+def decode_cursor(cursor: str):
+    """(listing token, offset), or None if the cursor is malformed"""
+    token, _, offset = cursor.partition('-')
+    try:
+        token, offset = int(token), int(offset)
+    except ValueError:
+        return None
+    return (token, offset) if offset >= 0 else None
+
+
+def free_icon_cell(columns: int = VFS_CONFIG['ICON_COLUMNS']) -> tuple:
+    """First desktop grid cell no icon uses - filled row by row"""
+    taken = set(ICON_POSITIONS.values())
+    row = 1
+    while True:
+        for column in range(1, columns + 1):
+            if (column, row) not in taken:
+                return column, row
+        row += 1
+
+
+class VirtualFS:
+    """Built-in folders and mounted directories behind one paged listing API"""
+
+    def __init__(self, folders: dict, mounts: dict, stat_cache: StatCache):
+        self.folders = folders  # Built-in folder name -> entry labels
+        self.mounts = {}  # Mounted folder name -> real root directory
+        self.stat_cache = stat_cache
+        for name, path in mounts.items():
+            self.mount(name, path)
+
+    def mount(self, name: str, path: str, icon: bool = True) -> bool:
+        """Show a real directory as a folder - on the desktop unless icon=False"""
+        root = os.path.realpath(path)
+        if not os.path.isdir(root):
+            logger.warning('Mount skipped - not a directory', extra={'path': path})
+            return False
+        self.mounts[name] = root
+        if icon and name not in ICON_POSITIONS:
+            ICON_POSITIONS[name] = free_icon_cell()
+        return True
+
+    def is_folder(self, name: str) -> bool:
+        return name in self.folders or name in self.mounts
+
+    def is_mounted(self, name: str) -> bool:
+        return name in self.mounts
+
+    def resolve(self, name: str, path: str = '') -> str:
+        """Real directory for a path inside a mount - never outside its root"""
+        root = self.mounts[name]
+        real = os.path.realpath(os.path.join(root, path))
+        if os.path.commonpath((root, real)) != root:
+            raise ValueError(f'{path!r} is outside {name}')
+        return real
+
+    def page(self, name: str, path: str = '', cursor: str = None, limit: int = None):
+        """
+        One page of entries plus the cursor for the next, or None when the
+        cursor belongs to a listing that has since changed
+        """
+        limit = limit or VFS_CONFIG['PAGE_SIZE']
+        position = decode_cursor(cursor) if cursor else None
+        token, offset = position or (None, 0)
+
+        if name in self.folders:
+            listing, listing_token = None, 0
+        else:
+            listing = self.stat_cache.listing(self.resolve(name, path))
+            listing_token = listing.mtime_ns
+
+        if token is not None and token != listing_token:
+            return None
+
+        if listing is None:
+            entries = self.folders[name]
+            page = entries[offset : offset + limit]
+            has_more = offset + limit < len(entries)
+        else:
+            page, has_more = listing.page(offset, limit)
+
+        next_cursor = encode_cursor(listing_token, offset + limit) if has_more else None
+        return page, next_cursor
+
+
+# Global instance
+virtual_fs = VirtualFS(FOLDER_CONTENTS, VFS_CONFIG['MOUNTS'], StatCache())
+
+register_cache('vfs_listings', lambda: len(virtual_fs.stat_cache))
@@ -0,0 +1,105 @@
+"""
+Warmup
+Fills the caches a first visitor would otherwise pay for, after startup and
+before /readyz reports the worker ready - /healthz answers throughout
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from desktop.assets import asset_pipeline
+from desktop.components import Window
+from desktop.shell import desktop_shell
+from desktop.state import ICON_POSITIONS
+from programs import program_registry
+
+logger = logging.getLogger(__name__)
+
+WARMUP_CONFIG = {
+    'ENABLED': os.environ.get('WARMUP', '1') != '0',
+    # Public URLs the shell is pre-rendered for - its cache key is the full URL,
+    # so list them as clients request them: WARMUP_URLS='https://os.example.com/'
+    'URLS': tuple(
+        url.strip()
+        for url in os.environ.get(
+            'WARMUP_URLS', f'http://localhost:{os.environ.get("PORT", 8000)}/'
+        ).split(',')
+        if url.strip()
+    ),
+}
+
+
+def warm_assets() -> int:
+    """Build every compressed variant now rather than on first request"""
+    return sum(len(asset.encodings) for asset in asset_pipeline.assets())
+
+
+def warm_fragments():
+    """Titlebars for every desktop window - icons are warmed by the shell"""
+    for name in ICON_POSITIONS:
+        Window(name, '')
+
+
+class Warmup:
+    """One warmup run per worker - readiness flips when it finishes"""
+
+    def __init__(self):
+        self.state = 'pending'  # pending, running, ready, failed
+        self.steps = {}  # step -> seconds taken
+        self.error = None
+        self._task = None
+
+    @property
+    def ready(self) -> bool:
+        # A failed warmup still serves - cold, but better than never ready
+        return self.state in ('ready', 'failed')
+
+    def start(self, app):
+        """Run in the background - called from the app's startup handler"""
+        if not WARMUP_CONFIG['ENABLED']:
+            self.state = 'ready'
+            return
+        self._task = asyncio.create_task(self.run(app))
+
+    async def run(self, app):
+        self.state = 'running'
+        started = time.perf_counter()
+        try:
+            await self._step('programs', asyncio.to_thread(program_registry.warmup))
+            await self._step('assets', asyncio.to_thread(warm_assets))
+            await self._step('fragments', asyncio.to_thread(warm_fragments))
+            for url in WARMUP_CONFIG['URLS']:
+                shell = asyncio.to_thread(desktop_shell.prerender, app, url)
+                await self._step(f'shell[{url}]', shell)
+            self.state = 'ready'
+        except Exception as e:
+            logger.exception('Warmup failed - serving with cold caches')
+            self.error = repr(e)
+            self.state = 'failed'
+        logger.info(
+            'Warmup finished',
+            extra={
+                'state': self.state,
+                'seconds': round(time.perf_counter() - started, 3),
+                'steps': self.steps,
+            },
+        )
+
+    async def _step(self, name: str, work):
+        started = time.perf_counter()
+        await work
+        self.steps[name] = round(time.perf_counter() - started, 3)
+
+    def status(self) -> dict:
+        return {
+            'ready': self.ready,
+            'state': self.state,
+            'steps': self.steps,
+            'error': self.error,
+        }
+
+
+# Global instance
+warmup = Warmup()
@@ -0,0 +1,335 @@
+"""
+Open-loop load generator for Retro OS
+Scenarios start at a constant arrival rate no matter how slow the server gets,
+so queueing shows up in the latency tail instead of silently lowering the load.
+Requests go over a pool of raw keep-alive HTTP/1.1 connections.
+
+    uv run python load-test.py --scenario mixed --rate 50 --duration 30
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def open_item(name: str, item_type: str, icon_x: int, icon_y: int):
+    """Icon click step - same form the desktop posts"""
+    data = {'name': name, 'type': item_type, 'icon_x': icon_x, 'icon_y': icon_y}
+    return ('POST', '/open', data)
+
+
+# Each scenario is one user's visit - (method, path, form data or None) steps
+SCENARIOS = {
+    'desktop': [
+        ('GET', '/', None),
+        open_item('Documents', 'folder', 1, 1),
+        ('POST', '/window/win-documents/move', {'x': 120, 'y': 80}),
+        open_item('Settings', 'program', 3, 3),
+    ],
+    'gameoflife': [
+        open_item('Game of Life', 'program', 1, 2),
+        ('POST', '/gameoflife/random', None),
+        ('POST', '/gameoflife/step', None),
+        ('POST', '/gameoflife/step', None),
+        ('POST', '/gameoflife/toggle/3/4', None),
+        ('POST', '/gameoflife/step', None),
+    ],
+    'ereader': [
+        open_item('eReader', 'program', 2, 3),
+        ('GET', '/ereader/library?sort=author', None),
+        ('POST', '/ereader/open', {'book_id': 'frankenstein'}),
+        ('GET', '/api/book/frankenstein/index', None),
+        ('GET', '/api/book/frankenstein/highlights', None),
+        ('POST', '/api/book/frankenstein/highlights/p_0003', None),
+        ('GET', '/api/book/frankenstein/search?q=monster', None),
+    ],
+}
+
+# Share of arrivals per scenario in the mixed workload
+MIXED_WEIGHTS = {'desktop': 5, 'gameoflife': 2, 'ereader': 3}
+
+
+class HTTPConnection:
+    """One keep-alive HTTP/1.1 connection - requests are sent one at a time"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+    async def request(self, method: str, path: str, body: bytes, headers: dict):
+        if self.writer is None:
+            await self.connect()
+
+        lines = [f'{method} {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        lines.append(f'Content-Length: {len(body)}')
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed by server')
+        status = int(status_line.split()[1])
+
+        response_headers = []
+        while (line := await self.reader.readline()) not in (b'\r\n', b''):
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.append((name.strip().lower(), value.strip()))
+        header_map = dict(response_headers)
+
+        if header_map.get('transfer-encoding') == 'chunked':
+            size = 0
+            while chunk_size := int((await self.reader.readline()).split(b';')[0], 16):
+                size += len(await self.reader.readexactly(chunk_size + 2)) - 2
+            await self.reader.readline()
+        else:
+            size = int(header_map.get('content-length', 0))
+            await self.reader.readexactly(size)
+
+        if header_map.get('connection') == 'close':
+            self.close()
+        return status, size, response_headers
+
+
+class ConnectionPool:
+    """Fixed set of keep-alive connections - callers queue when all are busy"""
+
+    def __init__(self, host: str, port: int, size: int):
+        self._idle = asyncio.Queue()
+        for _ in range(size):
+            self._idle.put_nowait(HTTPConnection(host, port))
+
+    async def request(self, method, path, body, headers):
+        connection = await self._idle.get()
+        try:
+            return await connection.request(method, path, body, headers)
+        except Exception:
+            # Drop the broken socket - the slot reconnects on next use
+            connection.close()
+            raise
+        finally:
+            self._idle.put_nowait(connection)
+
+    async def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+class Recorder:
+    """Latencies in nanoseconds per step label, plus status and error counts"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.bytes = 0
+
+    def record(self, label: str, elapsed_ns: int, status: int, size: int):
+        self.latencies.setdefault(label, []).append(elapsed_ns)
+        self.statuses[status] += 1
+        self.bytes += size
+
+    def summary(self) -> dict:
+        routes = {
+            label: summarize(latencies)
+            for label, latencies in sorted(self.latencies.items())
+        }
+        everything = [ns for latencies in self.latencies.values() for ns in latencies]
+        return {
+            'overall': summarize(everything),
+            'routes': routes,
+            'statuses': dict(self.statuses),
+            'errors': dict(self.errors),
+            'bytes': self.bytes,
+        }
+
+
+def percentile(sorted_values: list, pct: float):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, -(-len(sorted_values) * pct // 100) - 1))
+    return sorted_values[int(rank)]
+
+
+def summarize(latencies_ns: list) -> dict:
+    values = sorted(latencies_ns)
+    summary = {'count': len(values)}
+    for pct in PERCENTILES:
+        value = percentile(values, pct)
+        summary[f'p{pct:g}_ms'] = None if value is None else round(value / 1e6, 3)
+    summary['max_ms'] = round(values[-1] / 1e6, 3) if values else None
+    return summary
+
+
+def step_label(method: str, path: str) -> str:
+    """Group by route shape - query strings dropped"""
+    return f'{method} {path.split("?")[0]}'
+
+
+async def run_visit(pool, recorder, steps, cookie_jar: dict):
+    """One user's visit - steps run back to back with that user's session cookie"""
+    for method, path, data in steps:
+        body = urlencode(data).encode() if data else b''
+        headers = {'Accept-Encoding': 'gzip'}
+        if data:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if cookie_jar:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in cookie_jar.items())
+
+        # Timed from when the step was ready - time spent waiting for a pooled
+        # connection is part of the latency the user would see
+        start = time.perf_counter_ns()
+        try:
+            status, size, response_headers = await pool.request(
+                method, path, body, headers
+            )
+        except Exception as e:
+            recorder.errors[type(e).__name__] += 1
+            return
+        recorder.record(
+            step_label(method, path), time.perf_counter_ns() - start, status, size
+        )
+
+        for name, value in response_headers:
+            if name == 'set-cookie':
+                cookie_name, _, rest = value.partition('=')
+                cookie_jar[cookie_name] = rest.split(';')[0]
+
+
+async def run_load(url, scenario, rate, duration, connections, seed=None):
+    """Start visits at a constant rate for duration seconds, then drain"""
+    parts = urlsplit(url)
+    pool = ConnectionPool(parts.hostname, parts.port or 80, connections)
+    recorder = Recorder()
+    rng = random.Random(seed)
+
+    if scenario == 'mixed':
+        names = list(MIXED_WEIGHTS)
+        weights = [MIXED_WEIGHTS[name] for name in names]
+    else:
+        names, weights = [scenario], [1]
+
+    loop = asyncio.get_running_loop()
+    visits = set()
+    interval = 1 / rate
+    started = loop.time()
+    arrivals = int(rate * duration)
+
+    for i in range(arrivals):
+        # Absolute schedule - a late loop iteration never lowers the offered rate
+        delay = started + i * interval - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        steps = SCENARIOS[rng.choices(names, weights)[0]]
+        visit = asyncio.create_task(run_visit(pool, recorder, steps, {}))
+        visits.add(visit)
+        visit.add_done_callback(visits.discard)
+
+    scheduled = loop.time() - started
+    if visits:
+        await asyncio.gather(*visits)
+    elapsed = loop.time() - started
+    await pool.close()
+
+    summary = recorder.summary()
+    summary['config'] = {
+        'url': url,
+        'scenario': scenario,
+        'rate': rate,
+        'duration': duration,
+        'connections': connections,
+    }
+    summary['visits'] = arrivals
+    summary['schedule_lag_s'] = round(scheduled - (arrivals - 1) * interval, 3)
+    summary['elapsed_s'] = round(elapsed, 3)
+    summary['throughput_rps'] = round(summary['overall']['count'] / elapsed, 1)
+    return summary
+
+
+def print_report(summary: dict):
+    config = summary['config']
+    print('=' * 80)
+    print(
+        f'🚀 {config["scenario"]} @ {config["rate"]} visits/s for '
+        f'{config["duration"]}s over {config["connections"]} connections'
+    )
+    print('=' * 80)
+
+    header = f'{"route":<46}{"count":>7}' + ''.join(
+        f'{f"p{pct:g}":>9}' for pct in PERCENTILES
+    )
+    print(header + '  (ms)')
+    print('-' * len(header))
+    rows = [*summary['routes'].items(), ('ALL', summary['overall'])]
+    for label, stats in rows:
+        cells = ''.join(f'{stats[f"p{pct:g}_ms"]:>9.2f}' for pct in PERCENTILES)
+        print(f'{label[:45]:<46}{stats["count"]:>7}{cells}')
+
+    print('-' * len(header))
+    print(f'  Throughput:   {summary["throughput_rps"]} req/s')
+    print(f'  Statuses:     {summary["statuses"]}')
+    if summary['errors']:
+        print(f'  ❌ Errors:    {summary["errors"]}')
+    if summary['schedule_lag_s'] > 0.1:
+        print(
+            f'  ⚠️  Generator fell {summary["schedule_lag_s"]}s behind schedule - '
+            'results understate the offered load'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--scenario', default='mixed', choices=[*SCENARIOS, 'mixed'])
+    parser.add_argument('--rate', type=float, default=20, help='visits started/s')
+    parser.add_argument('--duration', type=float, default=10, help='seconds')
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--json', help='also write the summary to this file')
+    args = parser.parse_args()
+
+    try:
+        summary = asyncio.run(
+            run_load(
+                args.url,
+                args.scenario,
+                args.rate,
+                args.duration,
+                args.connections,
+                args.seed,
+            )
+        )
+    except OSError as e:
+        print(f'❌ Server not accessible at {args.url}: {e}')
+        sys.exit(1)
+
+    if not summary['overall']['count']:
+        print(f'❌ No successful requests to {args.url}: {summary["errors"]}')
+        sys.exit(1)
+
+    print_report(summary)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,68 +1,86 @@
-# main.py - Fixed imports and removed broken game-manager.js
+# main.py - app, desktop routes and debug endpoints
 
-import gc
+import asyncio
+import logging
 import os
 
-import psutil
-import uvicorn
 from fasthtml.common import (
     H2,
     Div,
     FastHTML,
     FileResponse,
+    HtmxResponseHeaders,
+    JSONResponse,
     Link,
     P,
+    Response,
     Script,
 )
 
-from desktop.components import Desktop
+from desktop.assets import asset_pipeline, asset_url
+from desktop.components import FolderPage, FolderView
+from desktop.logs import setup_logging
+from desktop.memory import MEMORY_CONFIG, allocation_tracker, cache_sizes
+from desktop.metrics import MetricsMiddleware, request_metrics
+from desktop.profiler import PROFILER_CONFIG, StackSampler, profile_lock
 from desktop.services import desktop_service
-from desktop.state import WINDOW_CONFIG, window_manager
-from programs.ereader.ereader import EReaderProgram
-from programs.ereader.routes import setup_ereader_routes
-from programs.game_of_life.routes import setup_gameoflife_routes
+from desktop.shell import desktop_shell
+from desktop.state import window_id_for, window_managers
+from desktop.vfs import virtual_fs
+from desktop.warmup import warmup
+from programs import program_registry
+
+# Records go through a queue to a writer thread - request paths never block
+setup_logging()
+logger = logging.getLogger(__name__)
 
 # Application setup
-css_link = Link(rel='stylesheet', href='/static/css/style.css', type='text/css')
+# Fingerprinted URLs - browsers cache these forever and never revalidate
+css_link = Link(
+    rel='stylesheet', href=asset_url('static/css/style.css'), type='text/css'
+)
+favicon_link = Link(rel='icon', href=asset_url('static/favicon.ico'))
 
+# Desktop core only - program scripts load when their window first opens
 scripts = [
-    Script(src='/static/js/desktop-manager.js'),
-    Script(src='/static/js/settings-manager.js'),
-    Script(src='/static/js/ereader.js'),
-    Script(src='/static/js/highlights-viewer.js'),
+    Script(src=asset_url('static/js/desktop-manager.js')),
+    Script(src=asset_url('static/js/settings-manager.js')),
 ]
 
 # Use unpacking for headers
-app = FastHTML(hdrs=(css_link, *scripts))
+app = FastHTML(hdrs=(css_link, favicon_link, *scripts))
+
+# Program routes are wired on first use
+program_registry.setup(app)
 
-# Setup program routes
-setup_gameoflife_routes(app)
-setup_ereader_routes(app)
+# Outermost middleware - times everything below it, lazy program loads included
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
+# Caches fill in the background after startup - /readyz turns 200 once hot
+app.add_event_handler('startup', lambda: warmup.start(app))
 
 
 @app.get('/')
-def home():
+def home(session, request):
     """Main desktop view - force fresh state"""
-    # Reset any stale window state
-    window_manager.windows.clear()
-    window_manager.open_folders.clear()
-    window_manager.minimized_positions.clear()
-    window_manager.available_positions = set(range(WINDOW_CONFIG['MAX_MINIMIZED']))
+    # Reset this session's stale window state - other sessions are untouched
+    window_managers.get(session).reset_desktop()
 
-    return Desktop()
+    # The shell only depends on static config - serve the pre-rendered bytes
+    return desktop_shell.response(request)
 
 
 @app.post('/open')
-def open_item(name: str, type: str, icon_x: int, icon_y: int):
+def open_item(name: str, type: str, icon_x: int, icon_y: int, session):
     """Handle icon click"""
     try:
-        # Force clear any existing window state
-        window_id = f'win-{name.replace(" ", "-").lower()}'
-        window_manager.windows.pop(window_id, None)  # Remove if exists
-        if name in ['Documents', 'Programs']:
-            window_manager.close_folder(name)  # Mark folder as closed
+        # Force clear any existing window state - also marks folders closed
+        window_id = window_id_for(name)
+        window_managers.get(session).close_window(window_id)
 
-        window, icon_update = desktop_service.open_item(name, type, icon_x, icon_y)
+        window, icon_update = desktop_service.open_item(
+            name, type, icon_x, icon_y, session
+        )
 
         if window is None:
             return ''
@@ -72,53 +90,111 @@ def open_item(name: str, type: str, icon_x: int, icon_y: int):
         return window
 
     except Exception as e:
-        print(f'ERROR in open_item: {e}')
+        logger.exception('Error in open_item')
         return Div(f'Error opening {name}: {str(e)}', cls='error-message')
 
 
+@app.get('/window/{window_id}/content')
+def window_content(window_id: str, session):
+    """Fresh content for an open window - rebuilt, never kept in window state"""
+    content = desktop_service.window_content(window_id, session)
+    if content is None:
+        return Response(status_code=404)
+    return content
+
+
+@app.get('/folder/{name}')
+def folder(name: str, path: str = '', cursor: str = None):
+    """A folder or subdirectory view, or the next page of one as it scrolls"""
+    if not virtual_fs.is_folder(name) or (path and not virtual_fs.is_mounted(name)):
+        return Response(status_code=404)
+    if not cursor:
+        return FolderView(name, path)
+
+    try:
+        page = virtual_fs.page(name, path, cursor)
+    except (OSError, ValueError):
+        return Response(status_code=404)
+    if page is None:
+        # The directory changed since the first page - offsets no longer line
+        # up, so reload the whole view in place of the window content
+        return FolderView(name, path), *HtmxResponseHeaders(
+            retarget='closest .window-content', reswap='innerHTML'
+        )
+    return tuple(FolderPage(name, path, *page))
+
+
 @app.post('/window/{window_id}/move')
-def move_window(window_id: str, x: int, y: int):
+def move_window(window_id: str, x: int, y: int, session):
     """Update window position"""
     try:
-        success = desktop_service.move_window(window_id, x, y)
+        success = desktop_service.move_window(window_id, x, y, session)
         return '' if success else 'Error'
-    except Exception as e:
-        print(f'ERROR in move_window: {e}')
+    except Exception:
+        logger.exception('Error in move_window')
         return ''
 
 
+@app.post('/window/sync')
+async def sync_windows(request, session):
+    """Batched window changes - the client coalesces to one patch per window"""
+    try:
+        body = await request.json()
+        changes = body.get('changes', []) if isinstance(body, dict) else None
+        applied = desktop_service.sync_windows(changes, session)
+    except ValueError as e:  # Malformed JSON or a bad patch - nothing was applied
+        logger.warning('Rejected window changes: %s', e)
+        return JSONResponse({'error': 'invalid window changes'}, status_code=400)
+    return JSONResponse({'applied': applied})
+
+
+@app.get('/assets/{path:path}')
+def fingerprinted_asset(path: str, request):
+    """Content-hashed asset from memory - immutable, precompressed"""
+    asset = asset_pipeline.by_url(f'/assets/{path}')
+    if asset is None:
+        return Response('Asset not found', media_type='text/plain', status_code=404)
+    return asset_pipeline.response(request, asset)
+
+
 @app.get('/favicon.ico')
-def favicon():
-    print(f'Current working directory: {os.getcwd()}')
-    print(f'Looking for file at: {os.path.abspath("static/favicon.ico")}')
-    print(f'File exists: {os.path.exists("static/favicon.ico")}')
-    return FileResponse('static/favicon.ico')
+def favicon(request):
+    """Browsers that ignore the icon link still get a cached favicon"""
+    return asset_pipeline.response(
+        request, asset_pipeline.get('static/favicon.ico'), immutable=False
+    )
 
 
 @app.get('/{fname:path}.{ext:static}')
-def static_file(fname: str, ext: str):
+def static_file(fname: str, ext: str, request):
     """Serve static files with proper extension handling"""
+    # Known assets come from memory and revalidate with their ETag
+    asset = asset_pipeline.get(f'{fname}.{ext}')
+    if asset is not None:
+        return asset_pipeline.response(request, asset, immutable=False)
     return FileResponse(f'{fname}.{ext}')
 
 
-@app.get('/ereader/library')
-def show_library():
-    """Return library view - Feature 2 entry point"""
-    from programs.ereader.library import LibraryView
-
-    return LibraryView()
+@app.get('/healthz')
+def healthz():
+    """Liveness - the worker is up and serving, warm or not"""
+    return JSONResponse({'status': 'ok'})
 
 
-@app.post('/ereader/open')
-def open_book(book_id: str):
-    """Open specific book - Feature 2 book launcher"""
-    program = EReaderProgram()
-    return program.get_window_content(book_id=book_id)
+@app.get('/readyz')
+def readyz():
+    """Readiness - 503 until warmup has run, so only hot workers get traffic"""
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
 
 
 @app.get('/debug/memory')
 def memory_stats():
     """Basic memory monitoring endpoint"""
+    # Debug-only dependencies - loaded on first use, not at startup
+    import gc
+
+    import psutil
+
     process = psutil.Process(os.getpid())
     memory_info = process.memory_info()
 
@@ -133,6 +209,91 @@ def memory_stats():
     )
 
 
+def memory_debug_disabled():
+    return JSONResponse(
+        {'error': 'memory debugging disabled - set DEBUG_TRACEMALLOC=1'},
+        status_code=404,
+    )
+
+
+@app.get('/debug/memory/caches')
+def memory_caches(deep: bool = False):
+    """Entry counts for every app cache - deep=1 also walks them for byte sizes"""
+    # deep=1 walks every session's state - never open to the public
+    if not MEMORY_CONFIG['TRACEMALLOC_ENABLED']:
+        return memory_debug_disabled()
+    return JSONResponse(cache_sizes(deep))
+
+
+@app.post('/debug/memory/tracemalloc/start')
+def tracemalloc_start(frames: int = MEMORY_CONFIG['FRAMES']):
+    """Start tracing allocations - the baseline is taken now"""
+    if not MEMORY_CONFIG['TRACEMALLOC_ENABLED']:
+        return memory_debug_disabled()
+    return JSONResponse(allocation_tracker.start(max(1, min(frames, 25))))
+
+
+@app.post('/debug/memory/tracemalloc/stop')
+def tracemalloc_stop():
+    if not MEMORY_CONFIG['TRACEMALLOC_ENABLED']:
+        return memory_debug_disabled()
+    return JSONResponse(allocation_tracker.stop())
+
+
+@app.get('/debug/memory/tracemalloc/snapshot')
+def tracemalloc_snapshot(limit: int = MEMORY_CONFIG['TOP']):
+    """Largest live allocation sites by file:line"""
+    if not MEMORY_CONFIG['TRACEMALLOC_ENABLED']:
+        return memory_debug_disabled()
+    if not allocation_tracker.running:
+        return JSONResponse({'error': 'tracemalloc not started'}, status_code=409)
+    return JSONResponse(allocation_tracker.snapshot(limit))
+
+
+@app.get('/debug/memory/tracemalloc/diff')
+def tracemalloc_diff(limit: int = MEMORY_CONFIG['TOP']):
+    """Allocation growth since start, by file:line"""
+    if not MEMORY_CONFIG['TRACEMALLOC_ENABLED']:
+        return memory_debug_disabled()
+    if allocation_tracker.baseline is None:
+        return JSONResponse({'error': 'tracemalloc not started'}, status_code=409)
+    return JSONResponse(allocation_tracker.diff(limit))
+
+
+@app.get('/debug/metrics')
+def metrics():
+    """Per-route latency, size and cache metrics for Prometheus"""
+    return Response(request_metrics.render(), media_type='text/plain; version=0.0.4')
+
+
+@app.get('/debug/profile')
+async def profile(seconds: float = 5, format: str = 'collapsed'):
+    """Sample every thread for N seconds - collapsed stacks or speedscope JSON"""
+    if not PROFILER_CONFIG['ENABLED']:
+        return JSONResponse(
+            {'error': 'Profiler disabled - set DEBUG_PROFILER=1'}, status_code=404
+        )
+    if not profile_lock.acquire(blocking=False):
+        return JSONResponse({'error': 'A profile is already running'}, status_code=409)
+
+    sampler = StackSampler()
+    try:
+        sampler.start()
+        await asyncio.sleep(min(max(seconds, 0.1), PROFILER_CONFIG['MAX_SECONDS']))
+    finally:
+        sampler.stop()
+        profile_lock.release()
+
+    if format == 'speedscope':
+        return JSONResponse(
+            sampler.speedscope(),
+            headers={
+                'Content-Disposition': 'attachment; filename=profile.speedscope.json'
+            },
+        )
+    return Response(sampler.collapsed(), media_type='text/plain')
+
+
 @app.get('/debug/fast-test')
 def fast_test():
     """Test FastHTML raw speed"""
@@ -159,15 +320,10 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
 
     if is_production:
-        # Production configuration
-        uvicorn.run(
-            'main:app',
-            host='0.0.0.0',
-            port=port,
-            reload=False,
-            log_level='info',
-            access_log=True,
-        )
+        # Supervised worker pool - sized, tuned and recycled in desktop.server
+        from desktop.server import serve
+
+        serve('main:app', host='0.0.0.0', port=port)
     else:
         # Local development configuration
         print('🚀 FastHTML Development Server')
@@ -175,6 +331,8 @@ if __name__ == '__main__':
         print(f'🌐 Network: http://0.0.0.0:{port}')
         print('🔄 Hot reload: enabled')
 
+        import uvicorn
+
         uvicorn.run(
             'main:app', host='0.0.0.0', port=port, reload=True, log_level='debug'
         )
@@ -0,0 +1,18 @@
+# programs/__init__.py
+"""
+Built-in programs
+Entry points only - each program is imported when it is first opened
+"""
+
+from .base import program_registry
+
+program_registry.register(
+    'Game of Life',
+    'programs.game_of_life.program:GameOfLifeApp',
+    route_prefixes=('/gameoflife/',),
+)
+program_registry.register(
+    'eReader',
+    'programs.ereader.program:EReaderApp',
+    route_prefixes=('/ereader/', '/api/book/'),
+)
@@ -0,0 +1,135 @@
+# programs/base.py
+"""
+Program Registry
+Programs are registered by entry point string - their modules, routes and
+background work load on first open, not at startup
+"""
+
+import importlib
+import threading
+from abc import ABC, abstractmethod
+
+from starlette.concurrency import run_in_threadpool
+
+
+class Program(ABC):
+    """Base class for desktop programs - one instance per worker"""
+
+    name = ''
+    scripts = ()  # Repo-relative client assets, loaded when a window first opens
+    styles = ()
+
+    def setup_routes(self, app):  # noqa: B027 - optional hook
+        """Register the program's routes - called once, on first load"""
+
+    def startup(self):  # noqa: B027 - optional hook
+        """Start background work - called once, after setup_routes"""
+
+    def shutdown(self):  # noqa: B027 - optional hook
+        """Stop background work - called on app shutdown if loaded"""
+
+    def warmup(self):  # noqa: B027 - optional hook
+        """Fill caches before the worker reports ready - called after startup"""
+
+    @abstractmethod
+    def get_content(self, session=None):
+        """Window content for a freshly opened program"""
+
+
+def load_entry_point(entry_point: str):
+    """Resolve 'package.module:attr' like a packaging entry point"""
+    module_name, _, attr = entry_point.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, attr) if attr else module
+
+
+class ProgramRegistry:
+    """Name -> entry point table that imports and wires programs lazily"""
+
+    def __init__(self):
+        self.app = None
+        self._entry_points = {}  # name -> 'module:Class'
+        self._prefixes = {}  # route prefix -> name, for programs not yet loaded
+        self._programs = {}  # name -> loaded Program
+        self._lock = threading.RLock()
+
+    def register(self, name: str, entry_point: str, route_prefixes=()):
+        """Declare a program - nothing is imported until it is used"""
+        self._entry_points[name] = entry_point
+        for prefix in route_prefixes:
+            self._prefixes[prefix] = name
+
+    def setup(self, app):
+        """Bind to the app - routes of unloaded programs load on first request"""
+        self.app = app
+        app.add_middleware(LazyProgramRoutes, registry=self)
+        app.add_event_handler('shutdown', self.shutdown)
+
+    def get(self, name: str):
+        """Loaded program by desktop name - None if no such program"""
+        program = self._programs.get(name)
+        if program is None and name in self._entry_points:
+            program = self.load(name)
+        return program
+
+    def load(self, name: str) -> Program:
+        with self._lock:
+            program = self._programs.get(name)
+            if program is not None:
+                return program
+
+            program = load_entry_point(self._entry_points[name])()
+            if self.app is not None:
+                program.setup_routes(self.app)
+            program.startup()
+
+            self._programs[name] = program
+            self._prefixes = {
+                prefix: owner
+                for prefix, owner in self._prefixes.items()
+                if owner != name
+            }
+            return program
+
+    def owner(self, path: str):
+        """Name of the unloaded program that owns this URL path, if any"""
+        for prefix, name in self._prefixes.items():
+            if path.startswith(prefix):
+                return name
+        return None
+
+    def warmup(self) -> list[str]:
+        """Load every registered program and let it fill its caches"""
+        for name in list(self._entry_points):
+            self.load(name).warmup()
+        return self.loaded()
+
+    def shutdown(self):
+        for program in list(self._programs.values()):
+            program.shutdown()
+
+    def __contains__(self, name):
+        return name in self._entry_points
+
+    def loaded(self) -> list[str]:
+        return list(self._programs)
+
+
+class LazyProgramRoutes:
+    """ASGI middleware - wires a program's routes before its first request"""
+
+    def __init__(self, app, registry: ProgramRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and self.registry._prefixes:
+            name = self.registry.owner(scope['path'])
+            if name is not None:
+                # Imports and startup work block - keep them off the event loop
+                await run_in_threadpool(self.registry.load, name)
+        await self.app(scope, receive, send)
+
+
+# Global instance - programs/__init__.py registers the built-in programs
+program_registry = ProgramRegistry()
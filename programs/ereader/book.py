@@ -0,0 +1,219 @@
+# programs/ereader/book.py
+"""Server-side book processing - text cleanup and paragraph index"""
+
+import gzip
+import json
+import os
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+
+from desktop.memory import register_cache
+
+BOOKS_DIR = os.path.join(os.path.dirname(__file__), 'books')
+BUILD_DIR = os.environ.get('EREADER_BUILD_DIR', os.path.join(BOOKS_DIR, 'build'))
+
+# Same cleanup chain the client used to run in BookLoader.processText(), in order.
+# Saved reading positions are offsets into this text, so the output must not drift.
+TEXT_START_MARKER = '*To Mrs. Saville, England.*'
+TEXT_REPLACEMENTS = [
+    (re.compile(r'<[^>]*>'), ''),
+    (re.compile(r'&(mdash|#8212);'), '—'),
+    (re.compile(r'&(nbsp|#160);'), ' '),
+    (re.compile(r'&(quot|ldquo|rdquo|#8220|#8221);'), '"'),
+    (re.compile(r'&(lsquo|rsquo|#8216|#8217);'), "'"),
+    (re.compile(r'&(amp|#38);'), '&'),
+    (re.compile(r'&(hellip|#8230);'), '...'),
+    (re.compile(r'\r?\n'), '\n'),
+    (re.compile(r'([a-zA-Z,;:.])\n([a-zA-Z])'), r'\1 \2'),
+    (re.compile(r'\n{2,}'), '\n\n'),
+]
+
+PARAGRAPH_SEPARATOR = '\n\n'
+CHAPTER_PATTERNS = [re.compile(r'Letter \d+'), re.compile(r'Chapter \d+')]
+PAGE_CHARS = 2000
+WORD_PATTERN = re.compile(r'\w+')
+
+
+@dataclass(frozen=True)
+class Paragraph:
+    id: str
+    start: int
+    end: int
+
+
+class BookIndex:
+    """Processed book text with stable paragraph IDs and offsets"""
+
+    def __init__(self, text: str, paragraphs=None, chapters=None, pages=None):
+        self.text = text
+        self.search_index = None
+
+        if paragraphs is None:
+            self._build_paragraphs()
+        else:
+            self.paragraphs = [Paragraph(*p) for p in paragraphs]
+
+        self.chapters = chapters if chapters is not None else self._find_chapters()
+        self.pages = pages if pages is not None else self._find_pages()
+        self._starts = [p.start for p in self.paragraphs]
+        self._by_id = {p.id: p for p in self.paragraphs}
+
+    def _build_paragraphs(self):
+        self.paragraphs = []
+
+        offset = 0
+        for i, chunk in enumerate(self.text.split(PARAGRAPH_SEPARATOR)):
+            stripped = chunk.strip()
+            start = offset + (chunk.find(stripped) if stripped else 0)
+            self.paragraphs.append(
+                Paragraph(f'p_{i:04d}', start, start + len(stripped))
+            )
+            offset += len(chunk) + len(PARAGRAPH_SEPARATOR)
+
+    def _find_chapters(self):
+        """Chapter boundaries as [name, start, end] - mirrors the client markers"""
+        markers = sorted(
+            (match.start(), match.group(0))
+            for pattern in CHAPTER_PATTERNS
+            for match in pattern.finditer(self.text)
+        )
+        return [
+            [name, pos, markers[i + 1][0] if i + 1 < len(markers) else len(self.text)]
+            for i, (pos, name) in enumerate(markers)
+        ]
+
+    def _find_pages(self, page_chars: int = PAGE_CHARS):
+        """Fixed-size page boundaries as [start, end], split on whitespace"""
+        pages = []
+        start = 0
+        while start < len(self.text):
+            end = min(start + page_chars, len(self.text))
+            if end < len(self.text):
+                split = self.text.rfind(' ', start, end)
+                end = split if split > start else end
+            pages.append([start, end])
+            start = end + 1 if end < len(self.text) else end
+        return pages
+
+    def get_paragraph(self, paragraph_id: str) -> Paragraph | None:
+        return self._by_id.get(paragraph_id)
+
+    def paragraph_at(self, position: int) -> Paragraph | None:
+        """Find the paragraph containing a text position - O(log n)"""
+        i = bisect_right(self._starts, position) - 1
+        return self.paragraphs[i] if i >= 0 else None
+
+    def paragraphs_in_range(self, start: int, end: int) -> list[Paragraph]:
+        """Paragraphs overlapping the [start, end) slice of the text"""
+        first = max(bisect_right(self._starts, start) - 1, 0)
+        last = bisect_right(self._starts, end - 1)
+        return [p for p in self.paragraphs[first:last] if p.end > start]
+
+    def build_search_index(self):
+        """Inverted index - lowercase word to sorted paragraph positions"""
+        postings = {}
+        for i, p in enumerate(self.paragraphs):
+            for word in set(WORD_PATTERN.findall(self.text[p.start : p.end].lower())):
+                postings.setdefault(word, []).append(i)
+        return postings
+
+    def search(self, query: str, limit: int = 20) -> list[Paragraph]:
+        """Paragraphs containing every word of the query"""
+        if self.search_index is None:
+            self.search_index = self.build_search_index()
+
+        words = WORD_PATTERN.findall(query.lower())
+        if not words:
+            return []
+
+        matches = set(self.search_index.get(words[0], ()))
+        for word in words[1:]:
+            matches.intersection_update(self.search_index.get(word, ()))
+        return [self.paragraphs[i] for i in sorted(matches)[:limit]]
+
+    def to_dict(self):
+        return {
+            'length': len(self.text),
+            'text': self.text,
+            'paragraphs': [[p.id, p.start, p.end] for p in self.paragraphs],
+            'chapters': self.chapters,
+            'pages': self.pages,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['text'], data['paragraphs'], data['chapters'], data['pages'])
+
+
+def process_text(raw: str) -> str:
+    """Normalize raw book text into the reading text served to clients"""
+    start = raw.find(TEXT_START_MARKER)
+    text = raw[start if start > -1 else 0 :]
+
+    for pattern, replacement in TEXT_REPLACEMENTS:
+        text = pattern.sub(replacement, text)
+
+    # JS String.trim() also drops a leading BOM
+    return text.strip().lstrip('\ufeff').strip()
+
+
+def book_path(book_id: str) -> str:
+    return os.path.join(BOOKS_DIR, f'{book_id}.txt')
+
+
+def artifact_dir(book_id: str) -> str | None:
+    """Current build of an ingested book - CURRENT names the live version dir"""
+    book_dir = os.path.join(BUILD_DIR, book_id)
+    try:
+        with open(os.path.join(book_dir, 'CURRENT'), encoding='utf-8') as f:
+            return os.path.join(book_dir, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def read_artifact(book_id: str, name: str) -> bytes | None:
+    """Read a precompressed artifact written by the ingestion worker"""
+    build = artifact_dir(book_id)
+    if build is None or not os.path.exists(os.path.join(build, name)):
+        return None
+    with open(os.path.join(build, name), 'rb') as f:
+        return f.read()
+
+
+@lru_cache(maxsize=8)
+def load_book_text(book_id: str = 'frankenstein') -> str:
+    """Load and cache the raw book text"""
+    artifact = read_artifact(book_id, 'text.txt.gz')
+    if artifact is not None:
+        return gzip.decompress(artifact).decode('utf-8')
+
+    with open(book_path(book_id), encoding='utf-8') as f:
+        text = f.read()
+
+    start_idx = text.find('CHAPTER I')
+    end_idx = text.find('End of the Project Gutenberg EBook')
+
+    if start_idx != -1 and end_idx != -1:
+        return text[start_idx:end_idx].strip()
+    else:
+        return text
+
+
+@lru_cache(maxsize=8)
+def get_book_index(book_id: str = 'frankenstein') -> BookIndex:
+    """Build and cache the paragraph index for a book"""
+    artifact = read_artifact(book_id, 'index.json.gz')
+    if artifact is not None:
+        index = BookIndex.from_dict(json.loads(gzip.decompress(artifact)))
+        search = read_artifact(book_id, 'search.json.gz')
+        if search is not None:
+            index.search_index = json.loads(gzip.decompress(search))
+        return index
+
+    return BookIndex(process_text(load_book_text(book_id)))
+
+
+register_cache('book_text', lambda: load_book_text.cache_info().currsize)
+register_cache('book_index', lambda: get_book_index.cache_info().currsize)
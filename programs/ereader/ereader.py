@@ -1,10 +1,15 @@
 # programs/ereader/ereader.py
 from fasthtml.common import *
 
+from desktop.fragments import cached_fragment
+
 
 class EReaderProgram:
-    def __init__(self):
-        self.mode = 'library'  # Default to library mode
+    """
+    Library and book views - stateless, so one instance serves every session
+    The warm state lives in the shared caches: the reader shell fragment,
+    the book text and its index. Reading position stays in the browser.
+    """
 
     def get_window_content(self, session=None, book_id=None):
         """
@@ -12,11 +17,8 @@ class EReaderProgram:
         Clean separation of concerns
         """
         if book_id:
-            self.mode = 'reader'
             return self._get_book_reader_content(book_id, session)
-        else:
-            self.mode = 'library'
-            return self._get_library_content(session)
+        return self._get_library_content(session)
 
     def _get_library_content(self, session):
         """Return library interface"""
@@ -26,48 +28,63 @@ class EReaderProgram:
 
     def _get_book_reader_content(self, book_id, session):
         """Return book reader interface for specific book"""
-        from .library import BOOK_REGISTRY
+        return cached_reader_shell(book_id)
 
-        book = BOOK_REGISTRY[book_id]
 
-        return Div(
-            Div(
-                Button(
-                    '🏠',
-                    hx_get='/ereader/library',
-                    hx_target='closest .window-content',
-                    cls='home-btn',
-                ),
-                H3(f'📖 {book["title"]}'),
-                P(
-                    f'by {book["author"]}',
-                    style='font-style: italic; color: var(--primary-dim);',
-                ),
-                cls='ereader-header',
-            ),
-            # Progress bars from Feature 1
-            Div(
-                Div(id='chapter-progress-fill', cls='chapter-progress-fill'),
-                cls='chapter-progress-container',
-            ),
-            Div(
-                Div(id='book-progress-fill', cls='book-progress-fill'),
-                cls='book-progress-container',
+@cached_fragment('reader_shell', tags=lambda book_id: (f'book:{book_id}',))
+def cached_reader_shell(book_id: str):
+    """Reader chrome HTML - shared by every session reading the book"""
+    from .library import BOOK_REGISTRY
+
+    return ReaderShell(book_id, BOOK_REGISTRY[book_id])
+
+
+def ReaderShell(book_id, book):
+    """Reader chrome - header, progress bars, page container and navigation"""
+    return Div(
+        Div(
+            Button(
+                '🏠',
+                hx_get='/ereader/library',
+                hx_target='closest .window-content',
+                cls='home-btn',
             ),
-            Div(
-                P(
-                    'Loading book content...',
-                    style='text-align: center; color: var(--primary-dim);',
-                ),
-                cls='ereader-page',
-                id='book-content',
-                **{'data-book-id': book_id},
+            H3(f'📖 {book["title"]}'),
+            P(
+                f'by {book["author"]}',
+                style='font-style: italic; color: var(--primary-dim);',
             ),
-            Div(
-                Button('← Previous', id='prev-btn', disabled=True),
-                Span('Page 1 of 1', id='page-info'),
-                Button('Next →', id='next-btn', disabled=True),
-                cls='ereader-nav',
+            cls='ereader-header',
+        ),
+        # Progress bars from Feature 1
+        Div(
+            Div(id='chapter-progress-fill', cls='chapter-progress-fill'),
+            cls='chapter-progress-container',
+        ),
+        Div(
+            Div(id='book-progress-fill', cls='book-progress-fill'),
+            cls='book-progress-container',
+        ),
+        Div(
+            P(
+                'Loading book content...',
+                style='text-align: center; color: var(--primary-dim);',
             ),
-            cls='ereader-content',
-        )
+            cls='ereader-page',
+            id='book-content',
+            **{'data-book-id': book_id},
+        ),
+        Div(
+            Button('← Previous', id='prev-btn', disabled=True),
+            Span('Page 1 of 1', id='page-info'),
+            Button('Next →', id='next-btn', disabled=True),
+            cls='ereader-nav',
+        ),
+        cls='ereader-content',
+        # Pages are laid out in the browser - keep them while minimized
+        data_keep_body=True,
+    )
+
+
+# Global instance
+ereader_program = EReaderProgram()
@@ -0,0 +1,57 @@
+# programs/ereader/highlights.py
+"""Highlighted paragraph IDs per session - in the state backend, not the cookie"""
+
+from desktop.backends import state_backend
+from desktop.sessions import get_session_id
+
+HIGHLIGHTS_NAMESPACE = 'ereader_highlights'
+HIGHLIGHTS_TTL = 90 * 24 * 3600  # Seconds kept after a session's last change
+LEGACY_SESSION_KEY = 'ereader_highlights'  # Where the signed cookie held them
+
+
+def _key(session) -> str:
+    return f'{HIGHLIGHTS_NAMESPACE}:{get_session_id(session)}'
+
+
+def all_highlights(session) -> dict:
+    """book_id -> highlighted paragraph IDs for this session"""
+    if session is None:
+        return {}
+
+    # Move highlights out of cookies written before the backend held them
+    legacy = session.pop(LEGACY_SESSION_KEY, None)
+    if legacy:
+
+        def merge(highlights):
+            highlights = highlights or {}
+            for book_id, ids in legacy.items():
+                merged = highlights.setdefault(book_id, [])
+                merged.extend(i for i in ids if i not in merged)
+            return highlights
+
+        return state_backend.update(_key(session), merge, HIGHLIGHTS_TTL)
+    return state_backend.get(_key(session)) or {}
+
+
+def book_highlights(session, book_id: str) -> set:
+    return set(all_highlights(session).get(book_id, ()))
+
+
+def toggle_highlight(session, book_id: str, paragraph_id: str) -> bool:
+    """Flip one paragraph - returns whether it is highlighted now"""
+    all_highlights(session)  # Migrates cookie highlights before the toggle
+
+    # Atomic in the backend, so rapid toggles from two tabs both count
+    def toggle(highlights):
+        highlights = highlights or {}
+        ids = highlights.setdefault(book_id, [])
+        if paragraph_id in ids:
+            ids.remove(paragraph_id)
+        else:
+            ids.append(paragraph_id)
+        if not ids:
+            del highlights[book_id]
+        return highlights
+
+    highlights = state_backend.update(_key(session), toggle, HIGHLIGHTS_TTL)
+    return paragraph_id in highlights.get(book_id, ())
@@ -0,0 +1,424 @@
+# programs/ereader/ingest.py
+"""
+Book ingestion pipeline
+Drop a .txt or .epub into the inbox - a background worker cleans it up,
+builds the indexes, writes precompressed artifacts and registers the book
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import posixpath
+import re
+import shutil
+import threading
+import time
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from xml.etree import ElementTree
+
+try:
+    import fcntl
+except ImportError:  # Windows - no flock, every process ingests
+    fcntl = None
+
+from .book import (
+    BOOKS_DIR,
+    BUILD_DIR,
+    BookIndex,
+    get_book_index,
+    load_book_text,
+    process_text,
+)
+from .library import (
+    BUILTIN_BOOK_IDS,
+    register_book,
+    registry_snapshot,
+    reload_ingested_books,
+)
+
+logger = logging.getLogger(__name__)
+
+INBOX_DIR = os.environ.get('EREADER_INBOX_DIR', os.path.join(BOOKS_DIR, 'inbox'))
+INGEST_ENABLED = os.environ.get('EREADER_INGEST', '1') != '0'
+POLL_INTERVAL = float(os.environ.get('EREADER_INGEST_INTERVAL', 5))
+SETTLE_SECONDS = 2  # Skip files still being copied in
+LOCK_FILE = os.path.join(BUILD_DIR, 'ingest.lock')  # Held by the ingesting process
+
+SUPPORTED_EXTENSIONS = ('.txt', '.epub')
+TEXT_ENCODINGS = ('utf-8-sig', 'cp1252', 'latin-1')
+
+GUTENBERG_START = re.compile(
+    r'^\*\*\* ?START OF (THE|THIS) PROJECT GUTENBERG.*$', re.I | re.M
+)
+GUTENBERG_END = re.compile(r'^\*\*\* ?END OF (THE|THIS) PROJECT GUTENBERG', re.I | re.M)
+HEADER_FIELD = re.compile(r'^(Title|Author|Original publication):\s*(.+)$', re.I | re.M)
+YEAR = re.compile(r'\b(1[4-9]\d\d|20\d\d)\b')
+
+EPUB_NS = {
+    'container': 'urn:oasis:names:tc:opendocument:xmlns:container',
+    'opf': 'http://www.idpf.org/2007/opf',
+    'dc': 'http://purl.org/dc/elements/1.1/',
+}
+
+
+def decode_text(data: bytes) -> str:
+    """Decode with the first encoding that fits, then normalize"""
+    for encoding in TEXT_ENCODINGS:
+        try:
+            text = data.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+
+    text = unicodedata.normalize('NFC', text)
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def strip_boilerplate(text: str) -> tuple[str, str]:
+    """Split Project Gutenberg header/license off - returns (header, body)"""
+    header = ''
+    start = GUTENBERG_START.search(text)
+    if start:
+        header, text = text[: start.start()], text[start.end() :]
+
+    end = GUTENBERG_END.search(text)
+    if end:
+        text = text[: end.start()]
+
+    return header, text.strip()
+
+
+def extract_text_metadata(header: str, body: str) -> dict:
+    """Title/author/year from a Gutenberg header, else the opening lines"""
+    fields = {key.lower(): value.strip() for key, value in HEADER_FIELD.findall(header)}
+    metadata = {
+        'title': fields.get('title', ''),
+        'subtitle': '',
+        'author': fields.get('author', ''),
+        'year': None,
+    }
+
+    year = YEAR.search(fields.get('original publication', ''))
+    if year:
+        metadata['year'] = int(year.group(1))
+
+    # Title page convention: title, optional "or, ..." subtitle, "by ..."
+    lines = [line.strip() for line in body[:2000].splitlines() if line.strip()]
+    for i, line in enumerate(lines[:6]):
+        if line.lower().startswith('by ') and not metadata['author']:
+            metadata['author'] = line[3:].strip()
+        elif line.lower().startswith('or, ') and i > 0:
+            metadata['subtitle'] = line.rstrip(';,.')
+
+    if not metadata['title'] and lines:
+        metadata['title'] = lines[0].rstrip(';,.')
+
+    return metadata
+
+
+class _HTMLTextExtractor(HTMLParser):
+    """Collects readable text, one paragraph per block element"""
+
+    BLOCK_TAGS = {'p', 'div', 'br', 'li', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+    SKIP_TAGS = {'head', 'script', 'style'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.paragraphs = []
+        self._current = []
+        self._skip_depth = 0
+
+    def _flush(self):
+        text = ' '.join(''.join(self._current).split())
+        if text:
+            self.paragraphs.append(text)
+        self._current = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in self.BLOCK_TAGS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._current.append(data)
+
+
+def html_to_text(markup: str) -> str:
+    parser = _HTMLTextExtractor()
+    parser.feed(markup)
+    parser.close()
+    parser._flush()
+    return '\n\n'.join(parser.paragraphs)
+
+
+def read_epub(path: str) -> tuple[dict, str]:
+    """Metadata from the OPF package, text from the spine in reading order"""
+    with zipfile.ZipFile(path) as epub:
+        container = ElementTree.fromstring(epub.read('META-INF/container.xml'))
+        rootfile = container.find('.//container:rootfile', EPUB_NS)
+        opf_path = rootfile.get('full-path')
+        opf = ElementTree.fromstring(epub.read(opf_path))
+
+        def dc(name):
+            element = opf.find(f'.//dc:{name}', EPUB_NS)
+            return (element.text or '').strip() if element is not None else ''
+
+        year = YEAR.search(dc('date'))
+        metadata = {
+            'title': dc('title'),
+            'subtitle': '',
+            'author': dc('creator'),
+            'year': int(year.group(1)) if year else None,
+        }
+
+        manifest = {
+            item.get('id'): item.get('href')
+            for item in opf.iterfind('.//opf:manifest/opf:item', EPUB_NS)
+        }
+        base_dir = posixpath.dirname(opf_path)
+        sections = []
+        for itemref in opf.iterfind('.//opf:spine/opf:itemref', EPUB_NS):
+            href = manifest.get(itemref.get('idref'))
+            if href:
+                markup = decode_text(epub.read(posixpath.join(base_dir, href)))
+                sections.append(html_to_text(markup))
+
+    return metadata, '\n\n'.join(section for section in sections if section)
+
+
+def make_ingest_id(filename: str) -> str:
+    """Book ID from the file name - lowercase, underscores only"""
+    stem = os.path.splitext(os.path.basename(filename))[0].lower()
+    return re.sub(r'[^a-z0-9]+', '_', stem).strip('_') or 'book'
+
+
+def _write_gzip(path: str, data: bytes):
+    # mtime=0 keeps artifacts byte-identical across rebuilds
+    with open(path, 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+
+def build_book(path: str, build_dir: str = BUILD_DIR) -> tuple[str, dict]:
+    """
+    Full ingestion of one file - runs in the worker process, never on a request
+    Artifacts land in a content-addressed version dir, then CURRENT is flipped
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.sha256(raw).hexdigest()[:16]
+
+    if path.lower().endswith('.epub'):
+        metadata, body = read_epub(path)
+    else:
+        header, body = strip_boilerplate(decode_text(raw))
+        metadata = extract_text_metadata(header, body)
+
+    book_id = make_ingest_id(path)
+    index = BookIndex(process_text(body))
+
+    book_dir = os.path.join(build_dir, book_id)
+    version_dir = os.path.join(book_dir, digest)
+    if not os.path.isdir(version_dir):
+        tmp_dir = os.path.join(book_dir, f'.{digest}.{os.getpid()}.tmp')
+        os.makedirs(tmp_dir, exist_ok=True)
+        _write_gzip(os.path.join(tmp_dir, 'text.txt.gz'), body.encode('utf-8'))
+        _write_gzip(
+            os.path.join(tmp_dir, 'index.json.gz'),
+            json.dumps(index.to_dict(), separators=(',', ':')).encode('utf-8'),
+        )
+        _write_gzip(
+            os.path.join(tmp_dir, 'search.json.gz'),
+            json.dumps(index.build_search_index(), separators=(',', ':')).encode(),
+        )
+        try:
+            os.rename(tmp_dir, version_dir)
+        except OSError:
+            # Another worker process built the same version first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # Atomic pointer flip, then drop superseded versions
+    pointer_tmp = os.path.join(book_dir, f'.CURRENT.{os.getpid()}.tmp')
+    with open(pointer_tmp, 'w', encoding='utf-8') as f:
+        f.write(digest)
+    os.replace(pointer_tmp, os.path.join(book_dir, 'CURRENT'))
+
+    for entry in os.scandir(book_dir):
+        if entry.is_dir() and entry.name != digest and not entry.name.startswith('.'):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    stat = os.stat(path)
+    book_data = {
+        'title': metadata['title'] or book_id.replace('_', ' ').title(),
+        'subtitle': metadata['subtitle'],
+        'author': metadata['author'] or 'Unknown',
+        'year': metadata['year'],
+        'status': 'available',
+        'ingested': {
+            'file': os.path.basename(path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'digest': digest,
+            'paragraphs': len(index.paragraphs),
+            'chapters': len(index.chapters),
+        },
+    }
+    return book_id, book_data
+
+
+class IngestWorker:
+    """
+    Polls the inbox and hands new or changed files to a worker process
+    With several server workers only the one holding LOCK_FILE ingests - the
+    others reload the registry it writes, and take over if it exits
+    """
+
+    def __init__(
+        self,
+        inbox_dir: str = INBOX_DIR,
+        interval: float = POLL_INTERVAL,
+        lock_file: str = LOCK_FILE,
+    ):
+        self.inbox_dir = inbox_dir
+        self.interval = interval
+        self.lock_file = lock_file
+        self._stop = threading.Event()
+        self._thread = None
+        self._pool = None
+        self._lock_fd = None
+        self._seen = {}
+
+    @property
+    def leader(self) -> bool:
+        return self._pool is not None
+
+    def start(self):
+        """Start polling - no-op when disabled or already running"""
+        if not INGEST_ENABLED or self._thread is not None:
+            return
+
+        os.makedirs(self.inbox_dir, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name='ereader-ingest', daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1)
+        self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        self._release_lock()
+
+    def _acquire_lock(self) -> bool:
+        """Become the ingesting process if no other holds the lock"""
+        if fcntl is not None:
+            os.makedirs(os.path.dirname(self.lock_file), exist_ok=True)
+            fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                return False
+            # Released by the kernel if this process dies
+            self._lock_fd = fd
+
+        # Books the previous holder registered are already done
+        self._sync_registry()
+        for book_data in registry_snapshot().values():
+            source = book_data.get('ingested')
+            if source:
+                self._seen[source['file']] = (source['mtime_ns'], source['size'])
+
+        # spawn, not fork - the server process already runs threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=1, mp_context=multiprocessing.get_context('spawn')
+        )
+        logger.info('Ingesting books from %s', self.inbox_dir)
+        return True
+
+    def _release_lock(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _sync_registry(self):
+        """Load books the ingesting process registered"""
+        if reload_ingested_books():
+            load_book_text.cache_clear()
+            get_book_index.cache_clear()
+
+    def pending_files(self) -> list[str]:
+        """Supported inbox files that are new or changed since last ingest"""
+        pending = []
+        now = time.time()
+        with os.scandir(self.inbox_dir) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(
+                    SUPPORTED_EXTENSIONS
+                ):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime < SETTLE_SECONDS:
+                    continue
+                if self._seen.get(entry.name) != (stat.st_mtime_ns, stat.st_size):
+                    pending.append(entry.path)
+        return sorted(pending)
+
+    def poll(self):
+        """Ingest everything pending - returns the registered book IDs"""
+        registered = []
+        for path in self.pending_files():
+            stat = os.stat(path)
+            self._seen[os.path.basename(path)] = (stat.st_mtime_ns, stat.st_size)
+            if make_ingest_id(path) in BUILTIN_BOOK_IDS:
+                logger.warning(
+                    'Skipped %s - its ID belongs to a built-in book, rename the file',
+                    os.path.basename(path),
+                )
+                continue
+            try:
+                book_id, book_data = self._pool.submit(build_book, path).result()
+            except Exception:
+                logger.exception('Error ingesting %s', path)
+                continue
+
+            register_book(book_id, book_data)
+            load_book_text.cache_clear()
+            get_book_index.cache_clear()
+            registered.append(book_id)
+            logger.info('Ingested %s as %s', os.path.basename(path), book_id)
+        return registered
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.leader or self._acquire_lock():
+                    self.poll()
+                else:
+                    self._sync_registry()
+            except Exception:
+                logger.exception('Error in ingest worker')
+            self._stop.wait(self.interval)
+
+
+# Global instance
+ingest_worker = IngestWorker()
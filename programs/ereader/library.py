@@ -1,6 +1,30 @@
 # programs/ereader/library.py
+import base64
+import json
+import os
+import threading
+from bisect import bisect_right
+from functools import lru_cache
+from urllib.parse import urlencode
+
 from fasthtml.common import *
 
+from desktop.assets import asset_url
+from desktop.fragments import cached_fragment, fragment_cache
+from desktop.memory import register_cache
+
+from .book import BUILD_DIR
+
+REGISTRY_FILE = os.path.join(BUILD_DIR, 'registry.json')
+LIBRARY_PAGE_SIZE = 24
+
+# Sort orders for the library grid - keys are tuples so pages can bisect
+SORT_KEYS = {
+    'title': lambda book: (book['title'].casefold(),),
+    'author': lambda book: (book['author'].casefold(), book['title'].casefold()),
+    'year': lambda book: (book['year'] or 0, book['title'].casefold()),
+}
+
 # Book registry - clean data structure
 BOOK_REGISTRY = {
     'frankenstein': {
@@ -18,19 +42,166 @@ BOOK_REGISTRY = {
         'status': 'coming_soon',
     },
 }
+# Shipped books - an inbox file with the same ID must not replace one
+BUILTIN_BOOK_IDS = frozenset(BOOK_REGISTRY)
+
+_registry_lock = threading.Lock()
+_registry_version = 0
+_registry_mtime = None  # REGISTRY_FILE as last read or written by this process
+
+
+def _load_ingested_books():
+    """Entries added by the ingestion worker in earlier runs"""
+    try:
+        with open(REGISTRY_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_ingested_books():
+    """
+    Persist ingested entries - write to a temp file, then atomic rename
+    Called with _registry_lock held, so the registry cannot change mid-loop
+    """
+    global _registry_mtime
+    ingested = {
+        book_id: book_data
+        for book_id, book_data in BOOK_REGISTRY.items()
+        if 'ingested' in book_data
+    }
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    tmp_path = f'{REGISTRY_FILE}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(ingested, f, indent=2)
+    os.replace(tmp_path, REGISTRY_FILE)
+    _registry_mtime = os.stat(REGISTRY_FILE).st_mtime_ns
+
+
+def registry_snapshot() -> dict:
+    """Copy of BOOK_REGISTRY - iterate this, the registry changes under ingestion"""
+    with _registry_lock:
+        return dict(BOOK_REGISTRY)
+
+
+def registry_version() -> int:
+    """Bumped on every registry change - use it in cache keys"""
+    return _registry_version
+
+
+def register_book(book_id: str, book_data: dict):
+    """Add or replace a book - its artifacts must already be on disk"""
+    global _registry_version
+
+    if book_id in BUILTIN_BOOK_IDS:
+        raise ValueError(f'{book_id!r} is a built-in book')
+    with _registry_lock:
+        BOOK_REGISTRY[book_id] = book_data
+        _registry_version += 1
+        _save_ingested_books()
+
+    # Rendered cards and reader chrome for this book are stale now
+    fragment_cache.invalidate(f'book:{book_id}')
+
+
+def reload_ingested_books() -> list:
+    """Pick up books another process registered - returns the changed IDs"""
+    global _registry_version, _registry_mtime
+
+    try:
+        mtime = os.stat(REGISTRY_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    if mtime == _registry_mtime:
+        return []
+
+    ingested = _load_ingested_books()
+    with _registry_lock:
+        _registry_mtime = mtime
+        changed = [
+            book_id
+            for book_id, book_data in ingested.items()
+            if book_id not in BUILTIN_BOOK_IDS
+            and BOOK_REGISTRY.get(book_id) != book_data
+        ]
+        for book_id in changed:
+            BOOK_REGISTRY[book_id] = ingested[book_id]
+        if changed:
+            _registry_version += 1
+
+    for book_id in changed:
+        fragment_cache.invalidate(f'book:{book_id}')
+    return changed
+
+
+reload_ingested_books()
+
+
+@lru_cache(maxsize=8)
+def sorted_catalog(sort: str, version: int):
+    """Available books in display order as (sort key, book_id) - one per version"""
+    key = SORT_KEYS[sort]
+    return sorted(
+        (key(book_data), book_id)
+        for book_id, book_data in registry_snapshot().items()
+        if book_data['status'] == 'available'
+    )
+
+
+register_cache('library_catalog', lambda: sorted_catalog.cache_info().currsize)
+
+
+def encode_cursor(sort: str, entry) -> str:
+    """Opaque cursor pointing just past a catalog entry"""
+    key, book_id = entry
+    raw = json.dumps([sort, list(key), book_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(sort: str, cursor: str):
+    """Catalog entry from a cursor, or None if it is malformed or for another sort"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        cursor_sort, key, book_id = json.loads(raw)
+    except (ValueError, TypeError):
+        return None
+    if cursor_sort != sort:
+        return None
+    return tuple(key), book_id
+
 
+def library_page(sort: str = 'title', cursor: str = None, limit=LIBRARY_PAGE_SIZE):
+    """One page of book IDs plus the cursor for the next page"""
+    if sort not in SORT_KEYS:
+        sort = 'title'
+    catalog = sorted_catalog(sort, registry_version())
 
-def LibraryView(session=None):
+    start = 0
+    after = decode_cursor(sort, cursor) if cursor else None
+    if after is not None:
+        try:
+            start = bisect_right(catalog, after)
+        except TypeError:
+            start = 0
+
+    page = catalog[start : start + limit]
+    has_more = start + limit < len(catalog)
+    next_cursor = encode_cursor(sort, page[-1]) if page and has_more else None
+    return [book_id for _, book_id in page], next_cursor, len(catalog)
+
+
+def LibraryView(session=None, sort='title', cursor=None):
     """
     Main library interface - clean component responsibility
     No debug code mixed in - pure presentation logic
     """
-    available_books = [
-        book for book in BOOK_REGISTRY.values() if book['status'] == 'available'
-    ]
+    sort = sort if sort in SORT_KEYS else 'title'
+    book_ids, next_cursor, book_count = library_page(sort, cursor)
+
     return Div(
-        LibraryHeader(len(available_books)),
-        BookGrid(available_books),
+        LibraryHeader(book_count),
+        LibrarySortControls(sort),
+        BookGrid(book_ids, sort, next_cursor),
         LibraryActions(),
         cls='library-container',
     )
@@ -45,18 +216,57 @@ def LibraryHeader(book_count):
     )
 
 
-def BookGrid(books):
-    """Book grid layout component"""
+def LibrarySortControls(sort):
+    """Sort buttons - each reloads the first page in that order"""
     return Div(
+        Span('Sort by:', cls='library-sort-label'),
         *[
-            BookCard(book_id, book_data)
-            for book_id, book_data in BOOK_REGISTRY.items()
-            if book_data['status'] == 'available'
+            Button(
+                order.title(),
+                hx_get=f'/ereader/library?{urlencode({"sort": order})}',
+                hx_target='closest .window-content',
+                cls='secondary-btn active' if order == sort else 'secondary-btn',
+            )
+            for order in SORT_KEYS
         ],
+        cls='library-sort',
+    )
+
+
+def BookGrid(book_ids, sort='title', next_cursor=None):
+    """Book grid layout component"""
+    return Div(
+        *BookGridPage(book_ids, sort, next_cursor),
         cls='book-grid',
     )
 
 
+def BookGridPage(book_ids, sort='title', next_cursor=None):
+    """Cached cards for one page, plus a loader that fetches the next page"""
+    cards = [cached_book_card(book_id) for book_id in book_ids]
+    if next_cursor:
+        cards.append(LoadMoreBooks(sort, next_cursor))
+    return cards
+
+
+def LoadMoreBooks(sort, cursor):
+    """Infinite scroll sentinel - replaced by the next page once scrolled into view"""
+    return Div(
+        'Loading more books...',
+        hx_get=f'/ereader/library?{urlencode({"sort": sort, "cursor": cursor})}',
+        # The window content scrolls, not the page - revealed would never fire
+        hx_trigger='intersect once',
+        hx_swap='outerHTML',
+        cls='library-load-more',
+    )
+
+
+@cached_fragment('book_card', tags=lambda book_id: (f'book:{book_id}',))
+def cached_book_card(book_id: str):
+    """Rendered card HTML - register_book invalidates the book's tag"""
+    return BookCard(book_id, BOOK_REGISTRY[book_id])
+
+
 def BookCard(book_id, book_data):
     """Individual book card component"""
     return Div(
@@ -71,7 +281,10 @@ def BookCard(book_id, book_data):
 def BookCover(book_id):
     """Book cover with SVG icon"""
     return Div(
-        NotStr('<img src="/static/icons/book-open.svg" alt="Book" class="book-icon">'),
+        NotStr(
+            f'<img src="{asset_url("static/icons/book-open.svg")}" '
+            'alt="Book" class="book-icon">'
+        ),
         cls='book-cover',
     )
 
@@ -79,10 +292,11 @@ def BookCover(book_id):
 def BookInfo(book_data, book_id):
     """Book information display"""
     subtitle_text = f': {book_data["subtitle"]}' if book_data['subtitle'] else ''
+    year_text = f' ({book_data["year"]})' if book_data['year'] else ''
 
     return Div(
         H3(f'{book_data["title"]}{subtitle_text}', cls='book-title'),
-        P(f'by {book_data["author"]} ({book_data["year"]})', cls='book-author'),
+        P(f'by {book_data["author"]}{year_text}', cls='book-author'),
         BookProgress(book_data),
         cls='book-info',
     )
@@ -0,0 +1,42 @@
+# programs/ereader/program.py
+from programs.base import Program
+
+from .book import get_book_index, load_book_text
+from .ereader import cached_reader_shell, ereader_program
+from .ingest import ingest_worker
+from .library import SORT_KEYS, cached_book_card, library_page, registry_snapshot
+from .routes import setup_ereader_routes
+
+
+class EReaderApp(Program):
+    """Library and reader - book ingestion runs while it is loaded"""
+
+    name = 'eReader'
+    scripts = ('static/js/ereader.js',)
+
+    def setup_routes(self, app):
+        setup_ereader_routes(app)
+
+    def startup(self):
+        ingest_worker.start()
+
+    def shutdown(self):
+        ingest_worker.stop()
+
+    def warmup(self):
+        books = list(registry_snapshot().items())
+        available = [
+            book_id for book_id, book in books if book['status'] == 'available'
+        ]
+        # No more than the text cache holds - extra loads would evict each other
+        for book_id in available[: load_book_text.cache_info().maxsize]:
+            load_book_text(book_id)
+            get_book_index(book_id)
+            cached_reader_shell(book_id)
+        for book_id, _ in books:
+            cached_book_card(book_id)
+        for sort in SORT_KEYS:
+            library_page(sort)
+
+    def get_content(self, session=None):
+        return ereader_program.get_window_content(session)
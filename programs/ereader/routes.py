@@ -1,54 +1,135 @@
 # programs/ereader/routes.py
-from functools import lru_cache  # ADD THIS
+import logging
 
-from fasthtml.common import Div, Response
+from fasthtml.common import JSONResponse, Response
 
-from .ereader import EReaderProgram
+from desktop.assets import negotiate_encoding
 
+from .book import get_book_index, load_book_text, read_artifact
+from .ereader import ereader_program
+from .highlights import book_highlights, toggle_highlight
+from .library import BOOK_REGISTRY, BookGridPage, LibraryView, library_page
 
-def setup_ereader_routes(app):
-    """Setup eReader routes"""
+logger = logging.getLogger(__name__)
 
-    @app.post('/ereader/page/{page_num}')
-    def ereader_navigate(page_num: int, session):
-        """Handle eReader page navigation"""
-        try:
-            # Update session with new page
-            session['ereader_page'] = page_num
 
-            # Get updated content
-            program = EReaderProgram()
-            return program.get_window_content(session)
+def _unknown_book():
+    return JSONResponse({'error': 'Unknown book'}, status_code=404)
 
-        except Exception as e:
-            print(f'ERROR in ereader_navigate: {e}')
-            return Div(f'Error: {str(e)}')
 
-    @lru_cache(maxsize=1)
-    def load_book_text():
-        """Load and cache the book text"""
-        import os
+def _missing_book_file():
+    return JSONResponse({'error': 'Book file not found'}, status_code=404)
 
-        book_path = os.path.join(os.path.dirname(__file__), 'books', 'frankenstein.txt')
 
-        with open(book_path, encoding='utf-8') as f:
-            text = f.read()
+def setup_ereader_routes(app):
+    """Setup eReader routes"""
+
+    @app.get('/ereader/library')
+    def show_library(sort: str = 'title', cursor: str = None):
+        """Return library view - Feature 2 entry point"""
+        if cursor:
+            # Infinite scroll - just the next page of cards
+            book_ids, next_cursor, _ = library_page(sort, cursor)
+            return tuple(BookGridPage(book_ids, sort, next_cursor))
 
-        start_idx = text.find('CHAPTER I')
-        end_idx = text.find('End of the Project Gutenberg EBook')
+        return LibraryView(sort=sort)
 
-        if start_idx != -1 and end_idx != -1:
-            return text[start_idx:end_idx].strip()
-        else:
-            return text
+    @app.post('/ereader/open')
+    def open_book(book_id: str, session):
+        """Open specific book - Feature 2 book launcher"""
+        if book_id not in BOOK_REGISTRY:
+            return _unknown_book()
+        return ereader_program.get_window_content(session, book_id=book_id)
 
     @app.get('/api/book/frankenstein')
     def get_frankenstein():
         """Serve cached Frankenstein text"""
         try:
-            book_text = load_book_text()
+            book_text = load_book_text('frankenstein')
             return Response(content=book_text, media_type='text/plain')
         except FileNotFoundError:
             return Response(
                 content='Book file not found', media_type='text/plain', status_code=404
             )
+
+    @app.get('/api/book/{book_id}/index')
+    def get_book_paragraphs(book_id: str, request):
+        """Serve processed text with paragraph IDs and offsets"""
+        if book_id not in BOOK_REGISTRY:
+            return _unknown_book()
+
+        # Ingested books ship a pre-built gzip artifact - send it as-is
+        accepted = request.headers.get('accept-encoding', '')
+        if negotiate_encoding(accepted, ('gzip', 'identity')) == 'gzip':
+            artifact = read_artifact(book_id, 'index.json.gz')
+            if artifact is not None:
+                return Response(
+                    content=artifact,
+                    media_type='application/json',
+                    headers={'Content-Encoding': 'gzip', 'Vary': 'Accept-Encoding'},
+                )
+        try:
+            return JSONResponse(get_book_index(book_id).to_dict())
+        except FileNotFoundError:
+            return _missing_book_file()
+
+    @app.get('/api/book/{book_id}/search')
+    def search_book(book_id: str, q: str = '', limit: int = 20):
+        """Paragraphs containing every word of the query"""
+        if book_id not in BOOK_REGISTRY:
+            return _unknown_book()
+
+        try:
+            index = get_book_index(book_id)
+        except FileNotFoundError:
+            return _missing_book_file()
+        return JSONResponse(
+            {
+                'query': q,
+                'results': [
+                    [p.id, p.start, p.end] for p in index.search(q, min(limit, 100))
+                ],
+            }
+        )
+
+    @app.get('/api/book/{book_id}/highlights')
+    def get_highlights(book_id: str, session, start: int = 0, end: int = -1):
+        """Highlighted paragraph IDs for one page - the [start, end) text slice"""
+        if book_id not in BOOK_REGISTRY:
+            return _unknown_book()
+
+        try:
+            index = get_book_index(book_id)
+        except FileNotFoundError:
+            return _missing_book_file()
+        highlighted = book_highlights(session, book_id)
+        if end < 0:
+            end = len(index.text)
+
+        return JSONResponse(
+            {
+                'start': start,
+                'end': end,
+                'highlights': [
+                    p.id
+                    for p in index.paragraphs_in_range(start, end)
+                    if p.id in highlighted
+                ],
+            }
+        )
+
+    @app.post('/api/book/{book_id}/highlights/{paragraph_id}')
+    def toggle_paragraph_highlight(book_id: str, paragraph_id: str, session):
+        """Toggle a paragraph highlight for this session"""
+        if book_id not in BOOK_REGISTRY:
+            return _unknown_book()
+
+        try:
+            index = get_book_index(book_id)
+        except FileNotFoundError:
+            return _missing_book_file()
+        if index.get_paragraph(paragraph_id) is None:
+            return JSONResponse({'error': 'Unknown paragraph'}, status_code=404)
+
+        highlighted = toggle_highlight(session, book_id, paragraph_id)
+        return JSONResponse({'id': paragraph_id, 'highlighted': highlighted})
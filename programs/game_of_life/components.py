@@ -1,9 +1,8 @@
 # programs/game_of_life/components.py
-from functools import lru_cache
-
 from fasthtml.common import *
 
 from desktop.components import Icon
+from desktop.fragments import cached_fragment
 
 # Style constants to avoid long lines
 TITLE_STYLE = 'text-align: center; margin-bottom: 10px; color: var(--primary-color);'
@@ -25,29 +24,27 @@ def GameContainer(game):
     return GameOfLifeInterface(game)
 
 
-@lru_cache(maxsize=30)
-def cached_game_interface(generation: int, live_cells: int):
-    """Cache the static parts of the interface"""
-    return {
-        'title': H3("Conway's Game of Life", style=TITLE_STYLE),
-        'status': Div(
-            f'Generation: {generation} • Live cells: {live_cells}', style=STATUS_STYLE
-        ),
-        'controls': GameControls(),
-    }
+def GameHeader(generation: int, live_cells: int):
+    """Title and status - not cached, the counts change on every step"""
+    return (
+        H3("Conway's Game of Life", style=TITLE_STYLE),
+        Div(f'Generation: {generation} • Live cells: {live_cells}', style=STATUS_STYLE),
+    )
+
+
+@cached_fragment('game')
+def cached_game_controls():
+    """Cache the control buttons - they never change"""
+    return GameControls()
 
 
 def GameOfLifeInterface(game):
     """Clean, simple game interface - now with caching"""
-    # Get cached components
-    cached = cached_game_interface(game.generation, game.get_live_cell_count())
-
     return Div(
-        cached['title'],
-        cached['status'],
+        *GameHeader(game.generation, game.get_live_cell_count()),
         # Game grid (can't cache this effectively since it changes)
         Div(GameGrid(game), style=GRID_CONTAINER_STYLE),
-        cached['controls'],
+        cached_game_controls(),
         style='padding: 15px;',
     )
 
@@ -1,4 +1,5 @@
 # programs/game_of_life/game.py
+from desktop.backends import SyncedState, state_backend
 
 
 class GameOfLife:
@@ -65,6 +66,22 @@ class GameOfLife:
         """Get total number of living cells"""
         return sum(sum(row) for row in self.grid)
 
+    def dump_state(self):
+        """Compact snapshot - one '0'/'1' string per row"""
+        return {
+            'width': self.width,
+            'height': self.height,
+            'generation': self.generation,
+            'grid': [''.join('01'[cell] for cell in row) for row in self.grid],
+        }
 
-# Global game instance
+    def load_state(self, data):
+        self.width = data['width']
+        self.height = data['height']
+        self.generation = data['generation']
+        self.grid = [[cell == '1' for cell in row] for row in data['grid']]
+
+
+# Global game instance - mirrored into the shared state backend
 game = GameOfLife()
+game_state = SyncedState(state_backend, 'gameoflife', game)
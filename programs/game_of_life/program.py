@@ -0,0 +1,24 @@
+# programs/game_of_life/program.py
+from fasthtml.common import to_xml
+
+from programs.base import Program
+
+from .components import GameContainer
+from .game import game_state
+from .routes import setup_gameoflife_routes
+
+
+class GameOfLifeApp(Program):
+    """Shared Game of Life board"""
+
+    name = 'Game of Life'
+    scripts = ('programs/game_of_life/static/game-manager.js',)
+
+    def setup_routes(self, app):
+        setup_gameoflife_routes(app)
+
+    def warmup(self):
+        to_xml(self.get_content())
+
+    def get_content(self, session=None):
+        return GameContainer(game_state.load())
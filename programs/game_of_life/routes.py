@@ -8,45 +8,66 @@ from .components import (
     GameGrid,
     GameOfLifeInterface,
 )
-from .game import game
+from .game import game_state
 
 
 def setup_gameoflife_routes(app):
+    # Each change runs as one game_state transaction - concurrent requests, in
+    # this worker or another, apply in turn instead of overwriting each other.
+    # Responses render inside it, from the state the change produced.
+
     @app.post('/gameoflife/step')
     def step_game():
         """Return minimal HTML - just the changed parts"""
-        game.step()
 
-        # Build minimal response with just what changed
-        status = (
-            f'Generation: {game.generation} • Live cells: {game.get_live_cell_count()}'
-        )
+        def step(game):
+            game.step()
+
+            # Build minimal response with just what changed
+            status = (
+                f'Generation: {game.generation} • '
+                f'Live cells: {game.get_live_cell_count()}'
+            )
+
+            # Return a much smaller payload
+            return Div(
+                Div(status, style=STATUS_STYLE),
+                Div(GameGrid(game), style=GRID_CONTAINER_STYLE),
+                style='padding: 15px;',
+            )
 
-        # Return a much smaller payload
-        return Div(
-            Div(status, style=STATUS_STYLE),
-            Div(GameGrid(game), style=GRID_CONTAINER_STYLE),
-            style='padding: 15px;',
-        )
+        return game_state.transact(step)
 
     @app.post('/gameoflife/toggle/{x}/{y}')
     def toggle_cell(x: int, y: int):
         """Toggle cell and return full interface"""
-        game.toggle_cell(x, y)
-        return GameOfLifeInterface(game)
+
+        def toggle(game):
+            game.toggle_cell(x, y)
+            return GameOfLifeInterface(game)
+
+        return game_state.transact(toggle)
 
     @app.post('/gameoflife/clear')
     def clear_game():
         """Clear grid and return full interface"""
-        game.clear()
-        return GameOfLifeInterface(game)
+
+        def clear(game):
+            game.clear()
+            return GameOfLifeInterface(game)
+
+        return game_state.transact(clear)
 
     @app.post('/gameoflife/random')
     def randomize_game():
         """Randomize grid with 30% density"""
-        game.clear()
-        for y in range(game.height):
-            for x in range(game.width):
-                if random.random() < 0.3:
-                    game.grid[y][x] = True
-        return GameOfLifeInterface(game)
+
+        def randomize(game):
+            game.clear()
+            for y in range(game.height):
+                for x in range(game.width):
+                    if random.random() < 0.3:
+                        game.grid[y][x] = True
+            return GameOfLifeInterface(game)
+
+        return game_state.transact(randomize)
@@ -6,6 +6,68 @@ function isMobile() {
     return window.innerWidth <= 768
 }
 
+// =============================================================================
+// WINDOW STATE SYNC - COALESCED, ONE REQUEST PER INTERVAL
+// =============================================================================
+
+const windowSync = {
+    interval: 250,      // Drag updates reach the server at most this often
+    pending: new Map(), // windowId -> latest patch, later writes win per field
+    timer: null,
+    inFlight: false,
+
+    queue(windowId, patch, urgent = false) {
+        const current = this.pending.get(windowId) || { id: windowId }
+        this.pending.set(windowId, Object.assign(current, patch))
+        this.schedule(urgent)
+    },
+
+    schedule(urgent) {
+        if (urgent) {
+            // State changes go out on the next frame, batched with their peers
+            clearTimeout(this.timer)
+            this.timer = null
+            requestAnimationFrame(() => this.flush())
+        } else if (!this.timer) {
+            this.timer = setTimeout(() => this.flush(), this.interval)
+        }
+    },
+
+    takeBatch() {
+        const changes = [...this.pending.values()]
+        this.pending.clear()
+        clearTimeout(this.timer)
+        this.timer = null
+        return changes
+    },
+
+    async flush() {
+        if (this.inFlight || !this.pending.size) return
+        const changes = this.takeBatch()
+        this.inFlight = true
+        try {
+            await fetch('/window/sync', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ changes }),
+            })
+        } catch (error) {
+            console.error('Window sync failed', error)
+        } finally {
+            this.inFlight = false
+            if (this.pending.size) this.schedule(false)
+        }
+    },
+
+    flushOnExit() {
+        if (!this.pending.size) return
+        const body = JSON.stringify({ changes: this.takeBatch() })
+        navigator.sendBeacon('/window/sync', new Blob([body], { type: 'application/json' }))
+    },
+}
+
+window.addEventListener('pagehide', () => windowSync.flushOnExit())
+
 function init() {
     
     // =============================================================================
@@ -25,7 +87,7 @@ function init() {
                     
                     // ADD THIS - Change folder icon to open when window appears
                     const title = node.querySelector('.window-title')?.textContent
-                    if (title === 'Documents' || title === 'Programs') {
+                    if (node.querySelector('.file-explorer')) {
                         const icons = document.querySelectorAll('.desktop-icon')
                         icons.forEach(icon => {
                             const label = icon.querySelector('.icon-label')
@@ -48,6 +110,7 @@ function init() {
         if (window && !e.target.matches('button, input, select, textarea')) {
             zIndex += 10
             window.style.zIndex = zIndex
+            windowSync.queue(window.id, { focused: true })
         }
     })
     
@@ -82,8 +145,11 @@ function init() {
         
         const handleMove = (e) => {
             if (!isDragging) return
-            dragWindow.style.left = (e.clientX - offsetX) + 'px'
-            dragWindow.style.top = Math.max(0, e.clientY - offsetY) + 'px'
+            const x = e.clientX - offsetX
+            const y = Math.max(0, e.clientY - offsetY)
+            dragWindow.style.left = x + 'px'
+            dragWindow.style.top = y + 'px'
+            windowSync.queue(dragWindow.id, { position: [Math.round(x), Math.round(y)] })
         }
         
         const handleStop = () => {
@@ -112,7 +178,9 @@ function init() {
             if (!window) return
             
             window.style.display = 'none'
+            dropContent(window)
             addToTaskbar(windowId, window.querySelector('.window-title')?.textContent || 'Window')
+            windowSync.queue(windowId, { minimized: true }, true)
         },
         
         restore: (windowId) => {
@@ -123,6 +191,8 @@ function init() {
             zIndex += 10
             window.style.zIndex = zIndex
             removeFromTaskbar(windowId)
+            reloadContent(window)
+            windowSync.queue(windowId, { minimized: false, focused: true }, true)
         },
         
         maximize: (windowId) => {
@@ -131,7 +201,8 @@ function init() {
             
             zIndex += 10
             window.style.zIndex = zIndex
-            window.classList.toggle('window-maximized')
+            const maximized = window.classList.toggle('window-maximized')
+            windowSync.queue(windowId, { maximized, focused: true }, true)
         },
         
         close: (windowId) => {
@@ -140,7 +211,7 @@ function init() {
             
             // Check if it's a folder and update icon
             const title = window.querySelector('.window-title')?.textContent
-            if (title === 'Documents' || title === 'Programs') {
+            if (window.querySelector('.file-explorer')) {
                 // Update desktop icon to closed state
                 const icons = document.querySelectorAll('.desktop-icon')
                 icons.forEach(icon => {
@@ -156,6 +227,9 @@ function init() {
             
             window.remove()
             removeFromTaskbar(windowId)
+            // Closing supersedes anything still queued for this window
+            windowSync.pending.delete(windowId)
+            windowSync.queue(windowId, { closed: true }, true)
         },
         
         onWindowClosed: (windowId) => {
@@ -163,6 +237,23 @@ function init() {
         }
     }
     
+    // Minimized windows give up their body - the server rebuilds it on restore
+    // from the window's descriptor. Bodies holding client-only state opt out.
+    function dropContent(window) {
+        const body = window.querySelector('.window-content')
+        if (!body || body.querySelector('[data-keep-body]')) return
+        body.replaceChildren()
+    }
+
+    function reloadContent(window) {
+        const body = window.querySelector('.window-content')
+        if (!body || body.childElementCount) return
+        htmx.ajax('GET', `/window/${encodeURIComponent(window.id)}/content`, {
+            target: body,
+            swap: 'innerHTML',
+        })
+    }
+    
     function addToTaskbar(windowId, title) {
         let taskbar = document.getElementById('desktop-taskbar')
         if (!taskbar) {
@@ -197,6 +288,61 @@ function init() {
     
 }
 
+// =============================================================================
+// PROGRAM ASSETS - LOADED WHEN A WINDOW FIRST OPENS, ONCE PER PAGE
+// =============================================================================
+
+const loadedAssets = new Set()
+
+function seedLoadedAssets() {
+    document.querySelectorAll('script[src]').forEach(s => loadedAssets.add(s.getAttribute('src')))
+    document.querySelectorAll('link[rel="stylesheet"]').forEach(l => loadedAssets.add(l.getAttribute('href')))
+}
+
+function loadScript(src) {
+    return new Promise((resolve, reject) => {
+        const script = document.createElement('script')
+        script.src = src
+        script.onload = resolve
+        script.onerror = () => reject(new Error(`Failed to load ${src}`))
+        document.head.appendChild(script)
+    })
+}
+
+function loadProgramAssets(root) {
+    const markers = root.classList?.contains('program-assets')
+        ? [root]
+        : root.querySelectorAll?.('.program-assets') || []
+
+    markers.forEach(marker => {
+        const styles = (marker.dataset.styles || '').split(' ').filter(Boolean)
+        const scripts = (marker.dataset.scripts || '').split(' ').filter(Boolean)
+        marker.remove()
+
+        styles.forEach(href => {
+            if (loadedAssets.has(href)) return
+            loadedAssets.add(href)
+            const link = document.createElement('link')
+            link.rel = 'stylesheet'
+            link.href = href
+            document.head.appendChild(link)
+        })
+
+        // Sequential - a program's later scripts may depend on its earlier ones
+        scripts.reduce((chain, src) => chain.then(() => {
+            if (loadedAssets.has(src)) return
+            loadedAssets.add(src)
+            return loadScript(src).catch(error => {
+                loadedAssets.delete(src)
+                console.error(error)
+            })
+        }), Promise.resolve())
+    })
+}
+
+seedLoadedAssets()
+document.addEventListener('htmx:load', event => loadProgramAssets(event.target))
+
 // Initialize when DOM ready
 if (document.readyState === 'loading') {
     document.addEventListener('DOMContentLoaded', init)
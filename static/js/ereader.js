@@ -7,6 +7,7 @@ class ReaderState {
         this.currentPage = 0;
         this.savedPosition = 0;
         this.highlights = [];
+        this.highlightIds = new Set();
         this.currentChapter = { name: 'Unknown', index: 0 };
         this.saveTimer = null;
         this.load();
@@ -14,10 +15,10 @@ class ReaderState {
     
     load() {
         try {
+            // Text mirror for the Highlights viewer - which paragraphs are
+            // highlighted comes from the server in loadHighlights()
             const highlights = localStorage.getItem(`ereader-highlights-${this.userId}`);
-            if (highlights) {
-                this.highlights = JSON.parse(highlights);
-            }
+            if (highlights) this.highlights = JSON.parse(highlights);
             
             const savedPage = localStorage.getItem(`ereader-page-${this.userId}`);
             const savedPosition = localStorage.getItem(`ereader-position-${this.userId}`);
@@ -35,6 +36,34 @@ class ReaderState {
         }
     }
 
+    async loadHighlights(loader) {
+        try {
+            const response = await fetch(`/api/book/${loader.bookId}/highlights`);
+            if (!response.ok) throw new Error(`HTTP ${response.status}`);
+            const { highlights } = await response.json();
+            
+            const mirrored = new Map(this.highlights.map(h => [h.id, h]));
+            this.highlightIds = new Set(highlights);
+            this.highlights = highlights
+                .map(id => mirrored.get(id) || this.highlightEntry(id, loader))
+                .filter(Boolean);
+            console.log('🖍️ Loaded highlights:', this.highlightIds.size);
+        } catch (e) {
+            console.error('Failed to load highlights:', e);
+        }
+    }
+    
+    highlightEntry(paragraphId, loader) {
+        const para = loader.paragraphsById.get(paragraphId);
+        if (!para) return null;
+        return {
+            id: paragraphId,
+            text: loader.getParagraphText(para),
+            timestamp: new Date().toISOString(),
+            chapter: loader.getCurrentChapter(para.start) || { name: 'Unknown', index: 0 }
+        };
+    }
+
     save(textPosition) {
         if (this.saveTimer) {
             clearTimeout(this.saveTimer);
@@ -110,6 +139,7 @@ class ReaderState {
         
         if (index >= 0) {
             this.highlights.splice(index, 1);
+            this.highlightIds.delete(paragraphId);
             console.log('🖍️ Removed highlight:', paragraphId);
         } else {
             this.highlights.push({
@@ -118,8 +148,23 @@ class ReaderState {
                 timestamp: new Date().toISOString(),
                 chapter: this.currentChapter
             });
+            this.highlightIds.add(paragraphId);
             console.log('🖍️ Added highlight:', paragraphId);
         }
+
+        // The server holds the highlight set - its answer wins over ours
+        const bookId = window.ereaderInstance?.loader?.bookId;
+        if (bookId) {
+            fetch(`/api/book/${bookId}/highlights/${paragraphId}`, { method: 'POST' })
+                .then(response => response.ok ? response.json() : null)
+                .then(result => {
+                    if (result && result.highlighted !== this.highlightIds.has(paragraphId)) {
+                        console.warn('Highlight out of sync - reloading:', paragraphId);
+                        this.loadHighlights(window.ereaderInstance.loader);
+                    }
+                })
+                .catch(e => console.error('Failed to sync highlight:', e));
+        }
    }
 }
 
@@ -127,10 +172,13 @@ class ReaderState {
 // BOOK LOADER - Handles text processing and pagination
 // ============================================
 class BookLoader {
-    constructor() {
+    constructor(bookId) {
+        this.bookId = bookId;
         this.text = '';
         this.pages = [];
         this.paragraphs = [];
+        this.paragraphStarts = [];
+        this.paragraphsById = new Map();
         this.chapters = [];
         this.isLoaded = false;
     }
@@ -138,12 +186,10 @@ class BookLoader {
     async loadBook() {
         try {
             console.log('📚 Loading book...');
-            const response = await fetch('/api/book/frankenstein');
+            const response = await fetch(`/api/book/${this.bookId}/index`);
             if (!response.ok) throw new Error('Failed to load book');
             
-            const raw = await response.text();
-            this.processText(raw);
-            this.findChapters();
+            this.loadIndex(await response.json());
             this.isLoaded = true;
             
             console.log('📚 Book loaded:', {
@@ -157,54 +203,17 @@ class BookLoader {
         }
     }
     
-    processText(raw) {
-        const start = raw.indexOf('*To Mrs. Saville, England.*');
-        
-        // Single chain of replacements
-        this.text = raw.substring(start > -1 ? start : 0)
-            .replace(/<[^>]*>/g, '')
-            .replace(/&(mdash|#8212);/g, '—')
-            .replace(/&(nbsp|#160);/g, ' ')
-            .replace(/&(quot|ldquo|rdquo|#8220|#8221);/g, '"')
-            .replace(/&(lsquo|rsquo|#8216|#8217);/g, "'")
-            .replace(/&(amp|#38);/g, '&')
-            .replace(/&(hellip|#8230);/g, '...')
-            .replace(/\r?\n/g, '\n')
-            .replace(/([a-zA-Z,;:.])\n([a-zA-Z])/g, '$1 $2')
-            .replace(/\n{2,}/g, '\n\n')
-            .trim();
-        
-        this.paragraphs = this.text.split('\n\n').map((text, i) => ({
-            id: `p_${i.toString().padStart(4, '0')}`,
-            text: text.trim()
-        }));
+    loadIndex(index) {
+        // Text is already cleaned up server-side; paragraphs come as [id, start, end]
+        this.text = index.text;
+        this.paragraphs = index.paragraphs.map(([id, start, end]) => ({ id, start, end }));
+        this.paragraphStarts = this.paragraphs.map(p => p.start);
+        this.paragraphsById = new Map(this.paragraphs.map(p => [p.id, p]));
+        this.chapters = index.chapters.map(([name, pos, endPos]) => ({ name, pos, endPos }));
     }
     
-    findChapters() {
-        // Check cache
-        const cached = localStorage.getItem('book-chapters-cache');
-        if (cached) {
-            this.chapters = JSON.parse(cached);
-            return;
-        }
-        
-        // Find all chapter/letter markers
-        const markers = [];
-        [/Letter \d+/g, /Chapter \d+/g].forEach(pattern => {
-            let match;
-            while ((match = pattern.exec(this.text)) !== null) {
-                markers.push({ name: match[0], pos: match.index });
-            }
-        });
-        
-        // Sort and create boundaries
-        markers.sort((a, b) => a.pos - b.pos);
-        this.chapters = markers.map((m, i) => ({
-            ...m,
-            endPos: markers[i + 1]?.pos || this.text.length
-        }));
-        
-        localStorage.setItem('book-chapters-cache', JSON.stringify(this.chapters));
+    getParagraphText(para) {
+        return this.text.substring(para.start, para.end);
     }
     
     generatePages(startPos = 0, count = 20) {
@@ -242,13 +251,14 @@ class BookLoader {
                     if (chunkSize === 1) {
                         // Even a single word doesn't fit, save current page
                         if (currentPageText) {
+                            // Leave the word for the next page so page offsets stay exact
                             this.pages.push(currentPageText);
                             pagesAdded++;
-                            currentPageText = words[wordIndex];
-                            wordIndex++;
+                            currentPageText = '';
                         } else {
                             // Single word is too big for empty page (shouldn't happen)
-                            currentPageText = words[wordIndex];
+                            this.pages.push(words[wordIndex]);
+                            pagesAdded++;
                             wordIndex++;
                         }
                         break; // Start new page
@@ -290,12 +300,20 @@ class BookLoader {
         return pagesAdded;
     }
     
-    formatText(text, testing = false) {
+    formatText(text, testing = false, startPos = 0) {
+        // startPos is the page's offset into this.text, so each paragraph is
+        // resolved by binary search instead of scanning the whole book
+        const highlightIds = window.ereaderInstance?.state?.highlightIds;
+        let offset = startPos;
+        
         return text.split('\n\n')
-            .filter(p => p.trim())
             .map(p => {
-                const para = this.findParagraph(p.trim());
-                const highlighted = window.ereaderInstance?.state?.highlights.some(h => h.id === para?.id);
+                const chunkStart = offset;
+                offset += p.length + 2;
+                if (!p.trim()) return '';
+                
+                const para = testing ? null : this.paragraphAt(chunkStart + p.length - p.trimStart().length);
+                const highlighted = para && highlightIds?.has(para.id);
                 
                 return `<p data-id="${para?.id || 'unknown'}" style="
                     margin: 0 0 0.5em 0;
@@ -306,9 +324,20 @@ class BookLoader {
             }).join('');
     }
     
-    findParagraph(text) {
-        const preview = text.substring(0, 50);
-        return this.paragraphs.find(p => p.text.includes(preview));
+    paragraphAt(position) {
+        let lo = 0;
+        let hi = this.paragraphStarts.length - 1;
+        let found = -1;
+        while (lo <= hi) {
+            const mid = (lo + hi) >> 1;
+            if (this.paragraphStarts[mid] <= position) {
+                found = mid;
+                lo = mid + 1;
+            } else {
+                hi = mid - 1;
+            }
+        }
+        return found >= 0 ? this.paragraphs[found] : null;
     }
     
     getTextPosition(pageIndex) {
@@ -344,7 +373,9 @@ class EReader {
         console.log('🚀 Initializing EReader...');
         this.userId = this.getOrCreateUserId();
         this.state = new ReaderState(this.userId);
-        this.loader = new BookLoader();
+        this.loader = new BookLoader(
+            document.querySelector('.ereader-page')?.dataset.bookId || 'frankenstein'
+        );
         this.initialize();
     }
     
@@ -363,6 +394,7 @@ class EReader {
     async initialize() {
         try {
             await this.loader.loadBook();
+            await this.state.loadHighlights(this.loader);
             
             // Generate pages from beginning for consistency
             if (this.state.savedPosition > 0) {
@@ -404,7 +436,9 @@ class EReader {
         requestAnimationFrame(() => {
             // Render current page
             const pageText = this.loader.pages[this.state.currentPage] || '';
-            container.innerHTML = this.loader.formatText(pageText);
+            container.innerHTML = this.loader.formatText(
+                pageText, false, this.loader.getTextPosition(this.state.currentPage)
+            );
             
             // Update all UI elements at once
             const pageInfo = document.querySelector('.ereader-nav span');
@@ -458,14 +492,15 @@ class EReader {
             
             const id = p.getAttribute('data-id');
 
-            const para = this.loader.paragraphs.find(p => p.id === id);
+            const para = this.loader.paragraphsById.get(id);
             
             if (para) {
-                this.state.toggleHighlight(id, para.text);
-                this.state.saveNow(this.loader.getTextPosition(this.state.currentPage));
+                const position = this.loader.getTextPosition(this.state.currentPage);
+                this.state.toggleHighlight(id, this.loader.getParagraphText(para));
+                this.state.saveNow(position);
                 const container = document.querySelector('.ereader-page');
                 const pageText = this.loader.pages[this.state.currentPage];
-                container.innerHTML = this.loader.formatText(pageText);
+                container.innerHTML = this.loader.formatText(pageText, false, position);
             }
         });
     }
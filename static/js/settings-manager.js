@@ -3,9 +3,9 @@
 class SettingsManager {
     constructor() {
         this.prefix = 'retro-os-'
-        
-        // Load settings immediately when manager is created
-        setTimeout(() => this.loadAllOnStartup(), 100)
+        // Theme and font arrive in the server-rendered stylesheet - only
+        // settings saved before the cookies existed need applying here
+        this.loadAllOnStartup()
     }
     
     save(key, value) {
@@ -18,26 +18,36 @@ class SettingsManager {
         const value = stored ? JSON.parse(stored) : defaultValue
         return value
     }
+
+    readCookie(key) {
+        const name = this.prefix + key + '='
+        const match = document.cookie.split('; ').find(c => c.startsWith(name))
+        return match ? decodeURIComponent(match.slice(name.length)) : null
+    }
+
+    writeCookie(key, value) {
+        const maxAge = 60 * 60 * 24 * 365
+        document.cookie = `${this.prefix}${key}=${encodeURIComponent(value)}; path=/; max-age=${maxAge}; samesite=lax`
+    }
     
     loadAllOnStartup() {
         const theme = this.load('theme_color', 'green')
         const font = this.load('font', 'courier')
         const scanlines = this.load('scanline_intensity', 0.12)
-        
-        this.applySetting('theme_color', theme)
-        this.applySetting('font', font)
-        this.applySetting('scanline_intensity', scanlines)
-        
-        console.log('Settings loaded:', { theme, font, scanlines })
+
+        if (this.readCookie('theme_color') !== theme || this.readCookie('font') !== font) {
+            this.applySetting('theme_color', theme)
+            this.applySetting('font', font)
+        }
+        this.applyScanlines(scanlines)
     }
     
     applySetting(key, value) {
         switch(key) {
             case 'theme_color':
-                this.applyTheme(value)
-                break
             case 'font':
-                this.applyFont(value)
+                this.writeCookie(key, value)
+                this.applyThemeStylesheet()
                 break
             case 'scanline_intensity':
                 this.applyScanlines(value)
@@ -45,45 +55,21 @@ class SettingsManager {
         }
     }
 
-    applyTheme(themeColor) {
-        const hueMap = { 
-            green: 120, cyan: 180, amber: 45, purple: 270,
-            red: 348, orange: 24, pink: 328, lime: 120, blue: 210, white: 0
-        }
-        const hue = hueMap[themeColor] || 120
-        
-        let styleEl = document.getElementById('dynamic-theme')
-        if (!styleEl) {
-            styleEl = document.createElement('style')
-            styleEl.id = 'dynamic-theme'
-            document.head.appendChild(styleEl)
-        }
-        
-        styleEl.textContent = `:root { --primary-hue: ${hue} !important; }`
-    }
+    applyThemeStylesheet() {
+        // Unfingerprinted URL revalidates - the next page load gets the
+        // immutable one straight from the shell
+        const theme = this.load('theme_color', 'green')
+        const font = this.load('font', 'courier')
+        const href = `/themes/${theme}-${font}.css`
 
-    applyFont(font) {
-        const fontMap = {
-            courier: "'Courier New', monospace",
-            monaco: "'Monaco', monospace", 
-            consolas: "'Consolas', monospace",
-            fira: "'Fira Code', 'Courier New', monospace",
-            ubuntu: "'Ubuntu Mono', 'Courier New', monospace",
-            source: "'Source Code Pro', 'Courier New', monospace",
-            jetbrains: "'JetBrains Mono', 'Courier New', monospace",
-            roboto: "'Roboto Mono', 'Courier New', monospace",
-            inconsolata: "'Inconsolata', 'Courier New', monospace"
+        let link = document.getElementById('theme-stylesheet')
+        if (!link) {
+            link = document.createElement('link')
+            link.rel = 'stylesheet'
+            link.id = 'theme-stylesheet'
+            document.head.appendChild(link)
         }
-        const fontFamily = fontMap[font] || fontMap.courier
-        
-        let styleEl = document.getElementById('dynamic-font')
-        if (!styleEl) {
-            styleEl = document.createElement('style')
-            styleEl.id = 'dynamic-font'
-            document.head.appendChild(styleEl)
-        }
-        
-        styleEl.textContent = `:root { --system-font: ${fontFamily} !important; }`
+        if (link.getAttribute('href') !== href) link.href = href
     }
 
     applyScanlines(intensity) {
@@ -99,4 +85,4 @@ class SettingsManager {
 }
 
 // Also expose globally for settings form
-window.settingsManager = window.settingsManager || new SettingsManager()
\ No newline at end of file
+window.settingsManager = window.settingsManager || new SettingsManager()